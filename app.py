@@ -1,50 +1,157 @@
 import streamlit as st
-import yfinance as yf
+import time
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-import zipfile
-import io
-from math import floor
-from datetime import datetime
+
+from ares.backtest import backtest
+from ares.cache import SWRCache
+from ares.charts import CHART_WIDTH, INTRADAY, chart_history, price_figure
+from ares.core import EARNINGS_DAYS, analyze, fundamentals, load_ticker_data
+from ares.earnings import EarningsIndex
+from ares.export import export_zip
+from ares.fetch import download_panel
+from ares.fx import FxError, fx_history, latest_rates
+from ares.kpis import KPIS, PERCENT_KPIS
+from ares.metrics import METRICS
+from ares.screener import guess_currency, parse_tickers, screen_panel
+from ares.providers import get_provider
+from ares.store import PriceStore
+from ares.symbols import SymbolIndex
+from ares.warm import WARM_INTERVAL, Warmer
 
 # --- KONFIGURATION & STABILER CACHE ---
-@st.cache_data(ttl=1800)
+@st.cache_resource
+def get_price_store():
+    """Ein Speicher-Objekt pro Server-Prozess (teilt die Schreib-Locks über alle Sessions)."""
+    return PriceStore()
+
+@st.cache_resource
+def get_swr_cache():
+    """Prozessweiter Cache für Ticker-Daten und Wechselkurse (Stale-While-Revalidate, Budget über ARES_CACHE_MB)."""
+    return SWRCache(metrics=METRICS)
+
+@st.cache_resource
+def get_earnings_index():
+    """Lokaler Earnings-Index (Parquet unter ARES_DATA_DIR); der Warmer frischt ihn täglich auf."""
+    return EarningsIndex()
+
+@st.cache_resource
+def get_symbol_index():
+    """Memory-gemapptes Symbolverzeichnis; der Warmer baut es wöchentlich neu."""
+    return SymbolIndex()
+
+DATA_TTL = 1800
+FX_TTL = 3600
+
 def get_clean_data(ticker):
-    """Speichert nur serialisierbare Daten (DataFrames/Dicts) statt Ticker-Objekte."""
-    tk = yf.Ticker(ticker)
-    hist = tk.history(period="max")
-    info = tk.info
-    inc = tk.financials
-    bal = tk.balance_sheet
-    cf = tk.cashflow
-
-    cal_date = None
+    """SWR-Eintrag mit .value (TickerData), .fetched_at und .refreshing.
+    Nach Ablauf der TTL kommen die alten Daten sofort zurück, der Refresh läuft im Hintergrund.
+    Unvollständige Daten (leere Historie, fehlende Teile) werden schon nach RETRY_AFTER (60 s) neu geladen."""
+    store, earnings = get_price_store(), get_earnings_index()
+    return get_swr_cache().get(("data", ticker), lambda: load_ticker_data(ticker, store, earnings=earnings), ttl=DATA_TTL,
+                               incomplete=lambda data: data.incomplete)
+
+def fx_key(currencies, to_curr="EUR"):
+    return ("fx", tuple(sorted(set(currencies))), to_curr)
+
+@st.cache_data(ttl=DATA_TTL, max_entries=500)
+def get_chart_figure(ticker, period, version, width=CHART_WIDTH):
+    """Fertige Chart-Figur aus der bereits geladenen Historie – kein eigener Netzwerk-Aufruf.
+    `version` (Datenstand) sorgt dafür, dass ein Refresh der Historie auch den Chart erneuert."""
+    return price_figure(chart_history(get_clean_data(ticker).value.hist, period), width)
+
+@st.cache_data(ttl=300, max_entries=200)
+def get_intraday_history(ticker, period, interval):
+    # FIX: Ticker.history statt download verwenden, um MultiIndex-Probleme (einzelner Punkt) zu vermeiden
+    return get_provider().history(ticker, period=period, interval=interval)
+
+@st.cache_data(ttl=300, max_entries=200)
+def get_intraday_figure(ticker, period, interval, width=CHART_WIDTH):
+    return price_figure(get_intraday_history(ticker, period, interval), width)
+
+# Memoisierte Rechenschritte: Schlüssel ist (Ticker, Datenstand) plus die jeweils relevanten Eingaben
+@st.cache_data(ttl=DATA_TTL, max_entries=500)
+def get_fundamentals(ticker, version):
+    """KPI-Matrix, KPIs und Trends – hängen nur vom Datenstand ab, nicht vom Risiko-Setup."""
+    return fundamentals(get_clean_data(ticker).value)
+
+@st.cache_data(ttl=DATA_TTL, max_entries=2000)
+def get_analysis(ticker, version, acc_eur, risk_p, overnight, ex_rate, fx_error):
+    """Ampel und Positionsrechner laufen nur bei geändertem Risiko-Setup, Wechselkurs oder Datenstand neu."""
+    with METRICS.stage("kpis"):
+        funds = get_fundamentals(ticker, version)
+    return analyze(ticker, get_clean_data(ticker).value, acc_eur, risk_p, overnight, ex_rate, fx_error,
+                   timer=METRICS.stage, funds=funds)
+
+@st.cache_data(ttl=DATA_TTL, max_entries=500)
+def get_backtest(ticker, version, acc_eur, risk_p, overnight, ex_rate):
+    """Regeln auf jedem historischen Bar; EUR-Umrechnung vereinfacht mit dem aktuellen Kurs."""
+    data = get_clean_data(ticker).value
+    # Alle gesammelten Termine (auch vergangene) aus dem Index, sonst nur der nächste
+    dates = get_earnings_index().dates(ticker) or ([data.earn_date] if data.earn_date is not None else [])
+    earnings = {ticker: dates} if dates else None
+    result = backtest({ticker: data.hist}, acc_eur=acc_eur, risk_p=risk_p, overnight=overnight, earnings=earnings,
+                      ex_rate=ex_rate if ex_rate else np.nan)
+    summary = result.summary()
+    return summary[summary["Ticker"] != "Alle"].drop(columns="Ticker")
+
+@st.cache_data(ttl=DATA_TTL, max_entries=100)
+def get_export(ticker, version, fmt):
+    """ZIP mit Abschlüssen, kompletter Kurshistorie und FX-Reihe – je (Ticker, Datenstand, Format) einmal gebaut."""
+    data = get_clean_data(ticker).value
+    currency = data.info.get('currency', 'USD')
     try:
-        if tk.calendar is not None and not tk.calendar.empty:
-            cal_date = tk.calendar.iloc[0, 0]
-    except:
-        pass
+        fx = get_fx_history([currency]) if currency != "EUR" else None
+    except FxError:
+        fx = None
+    return export_zip(data, fmt, fx, hist=get_price_store().read(ticker))
+
+def get_fx_history(currencies, to_curr="EUR"):
+    """Tägliche FX-Reihen (1 Jahr) für alle Währungen – ein gebündelter Download je Währungs-Set."""
+    key = fx_key(currencies, to_curr)
+    return get_swr_cache().get(key, lambda: fx_history(key[1], to_curr), ttl=FX_TTL).value
 
-    return hist, info, inc, bal, cf, cal_date
+def get_exchange_rates(currencies, to_curr="EUR", strict=True):
+    """Aktuelle Kurse Währung -> to_curr. strict: FxError statt NaN, falls ein Kurs fehlt."""
+    return latest_rates(get_fx_history(currencies, to_curr), strict=strict)
 
-@st.cache_data(ttl=3600)
 def get_exchange_rate(from_curr, to_curr="EUR"):
-    if from_curr == to_curr or from_curr == "N/A": return 1.0
-    try:
-        pair = f"{from_curr}{to_curr}=X"
-        data = yf.download(pair, period="1d", progress=False)
-        return float(data['Close'].iloc[-1]) if not data.empty else 1.0
-    except:
+    if from_curr == to_curr:
+        METRICS.event("fx", "identity")
         return 1.0
-
-# --- HILFSFUNKTIONEN ---
-def get_val(df, keys):
-    if df is None or df.empty: return None
-    for k in keys:
-        if k in df.index:
-            val = df.loc[k].iloc[0]
-            if pd.notnull(val): return val
-    return None
+    return get_exchange_rates([from_curr], to_curr)[from_curr]
+
+def invalidate_ticker(ticker):
+    """Verwirft nur die Cache-Einträge dieses Tickers – andere Nutzer/Ticker bleiben warm."""
+    get_swr_cache().invalidate(lambda key: key[0] == "data" and key[1] == ticker)
+    for period, interval in INTRADAY.values():
+        get_intraday_history.clear(ticker, period, interval)
+        get_intraday_figure.clear(ticker, period, interval)
+
+# --- VORWÄRMEN: Watchlist (ARES_WATCHLIST) und beliebte Ticker bleiben im selben Cache warm ---
+@st.cache_resource
+def get_warmer():
+    """Startet einmal pro Server-Prozess (beim ersten Seitenaufruf) den Hintergrund-Worker."""
+    # Cache, Speicher und Index hier auflösen – der Worker-Thread hat keinen Streamlit-Kontext
+    cache, store, earnings, symbols = get_swr_cache(), get_price_store(), get_earnings_index(), get_symbol_index()
+
+    def warm_ticker(ticker):
+        entry = cache.warm(("data", ticker), lambda: load_ticker_data(ticker, store, earnings=earnings), WARM_INTERVAL,
+                           incomplete=lambda data: data.incomplete)
+        return entry.value.info.get('currency', 'USD')
+
+    def warm_currency(currency):
+        key = fx_key([currency])
+        cache.warm(key, lambda: fx_history(key[1], "EUR"), WARM_INTERVAL)
+
+    return Warmer(warm_ticker, warm_currency, refresh_earnings=lambda tickers: earnings.refresh(tickers=tickers),
+                  refresh_symbols=lambda: symbols.refresh(store=store)).start()
+
+@st.cache_data(ttl=1800, max_entries=50)
+def get_watchlist_panel(tickers):
+    """Kurs-Panel für die ganze Watchlist in einem gebündelten Download (tickers als Tupel)."""
+    return download_panel(tickers)
 
 # --- KENNZAHLEN: BESCHREIBUNGEN + WIKIPEDIA LINKS ---
 # Hinweis: Wenn es keinen/keinen stabilen deutschen Artikel gibt, verlinke ich auf den englischen Wikipedia-Artikel.
@@ -154,6 +261,9 @@ METRIC_DOCS = {
     },
 }
 
+# KPI-Bezeichnung in der Oberfläche -> Eintrag in METRIC_DOCS
+KPI_DOC_KEYS = {"EK-Rendite": "Eigenkapitalrendite", "Liquidität": "Current Ratio", "Verschuldung": "Verschuldungsgrad"}
+
 def caption_with_wiki(key: str) -> str:
     d = METRIC_DOCS.get(key)
     if not d:
@@ -180,16 +290,31 @@ st.markdown(
     unsafe_allow_html=True
 )
 
+warmer = get_warmer()
+symbols = get_symbol_index()
+
+def _pick_symbol():
+    st.session_state["ticker_input"] = st.session_state.pop("ticker_pick")
+
 # --- EINGABE & REFRESH ---
 col_in, col_ref = st.columns([4, 1])
 with col_in:
-    ticker_input = st.text_input("TICKER SYMBOL", placeholder="z.B. OMV.VI, NVDA, AAPL").upper()
-    st.markdown('<p class="hint">Tipp: Suche Tickersymbole via Google KI Suche.</p>', unsafe_allow_html=True)
+    ticker_input = st.text_input("TICKER SYMBOL", placeholder="z.B. OMV.VI, NVDA, AAPL", key="ticker_input").strip().upper()
+    if len(symbols):
+        # Autovervollständigung aus dem lokalen Verzeichnis: Symbol-Anfang, Firmenname oder Tippfehler
+        hits = symbols.search(ticker_input) if ticker_input and not symbols.known(ticker_input) else []
+        if hits:
+            labels = {h.symbol: f"{h.symbol} · {h.name}" if h.name else h.symbol for h in hits}
+            st.pills("Vorschläge", list(labels), format_func=labels.get, key="ticker_pick", on_change=_pick_symbol)
+        st.markdown('<p class="hint">Tipp: Symbol, Anfang davon oder Firmenname eingeben.</p>', unsafe_allow_html=True)
+    else:
+        st.markdown('<p class="hint">Tipp: Suche Tickersymbole via Google KI Suche.</p>', unsafe_allow_html=True)
 
 with col_ref:
     st.write(" ")
     if st.button("🔄 Update"):
-        st.cache_data.clear()
+        if ticker_input:
+            invalidate_ticker(ticker_input)
         st.rerun()
 
 # Risiko-Einstellungen
@@ -199,55 +324,164 @@ with st.expander("🛡️ KONTO- & RISIKO-SETUP", expanded=False):
     risk_p = c2.number_input("Risiko pro Trade (%)", value=1.0, step=0.1)
     overnight = st.selectbox("Haltedauer", ["Nur Intraday", "Über Nacht (Overnight)"], index=1) == "Über Nacht (Overnight)"
 
+# Watchlist-Screener: Ampel + Positionsrechner für viele Ticker auf einmal
+with st.expander("📋 WATCHLIST-SCREENER", expanded=False):
+    wl_text = st.text_area("Ticker-Liste (Komma, Leerzeichen oder Zeilenumbruch)", placeholder="AAPL, NVDA, OMV.VI, SAP.DE")
+    if st.button("Watchlist analysieren") and wl_text.strip():
+        wl = tuple(t for t in parse_tickers(wl_text) if symbols.accepts(t))
+        unknown = [t for t in parse_tickers(wl_text) if t not in wl]
+        if unknown:
+            st.warning(f"Unbekannte Symbole übersprungen: {', '.join(unknown)}")
+        with st.spinner(f"Lade {len(wl)} Ticker..."):
+            try:
+                panel = get_watchlist_panel(wl)
+                currencies = {guess_currency(t) for t in wl}
+                try:
+                    rates = get_exchange_rates(currencies, strict=False)
+                except FxError as e:
+                    # Sammelabruf gescheitert -> Ampel trotzdem zeigen, nur die Stückzahl bleibt leer
+                    st.warning(str(e))
+                    rates = {cur: 1.0 if cur == "EUR" else np.nan for cur in currencies}
+                index = get_earnings_index()
+                earnings = {t: index.next_date(t) for t in wl}
+                st.session_state["wl_result"] = screen_panel(panel, acc_eur, risk_p, rates, earnings, overnight, tickers=wl)
+                st.session_state["wl_earnings"] = index.upcoming(EARNINGS_DAYS[overnight], tickers=wl)
+                missing = [cur for cur, r in rates.items() if pd.isna(r)]
+                if missing:
+                    st.warning(f"Kein Wechselkurs für {', '.join(missing)} – Stückzahl dort leer.")
+            except Exception as e:
+                st.error(f"Watchlist-Fehler: {e}")
+    if "wl_result" in st.session_state:
+        st.dataframe(st.session_state["wl_result"], hide_index=True, use_container_width=True)
+        st.caption("Sortierbar per Klick auf die Spaltenköpfe. Währung aus dem Börsenkürzel abgeleitet; "
+                   "Earnings-Termine aus dem lokalen Index (täglich aktualisiert, Ticker ohne Eintrag ohne Earnings-Prüfung).")
+        upcoming = st.session_state.get("wl_earnings")
+        if upcoming is not None and not upcoming.empty:
+            st.write("**Earnings in der Sperrfrist:** " + ", ".join(
+                f"{t} ({d:%d.%m.})" for t, d in zip(upcoming["Ticker"], upcoming["Datum"])))
+
+# --- FRAGMENTE ---
+# Widgets innerhalb eines Fragments lösen nur dessen Neuaufbau aus, nicht den ganzen Skriptlauf
+@st.fragment
+def chart_section(ticker, version):
+    period = st.radio("Chart-Zeitraum", ["1T", "1W", "1M", "6M", "1J", "5J", "Max"], horizontal=True, index=4)
+
+    # Chart Logik (skaliert): nur Intraday geht ans Netz, der Rest kommt aus der Tages-Historie
+    # Figur je (Ticker, Zeitraum, Breite) gecacht; höchstens CHART_WIDTH Punkte gehen an den Browser
+    with METRICS.stage("chart_fetch"):
+        if period in INTRADAY:
+            fig = get_intraday_figure(ticker, *INTRADAY[period])
+        else:
+            fig = get_chart_figure(ticker, period, version)
+
+    with METRICS.stage("chart_render"):
+        st.plotly_chart(fig, use_container_width=True)
+
+@st.fragment
+def trend_section(result):
+    st.write("---")
+    st.subheader("📉 Historische Trends (Chronologisch)")
+    trend_options = ["Umsatz", "Reingewinn", "EBITDA", "Eigenkapital", "Operativer Cashflow"] + KPIS
+    sel_trend = st.selectbox("Metrik wählen:", trend_options)
+
+    with METRICS.stage("trend_chart"):
+        # Positionen aus den Abschlüssen, Kennzahlen aus der KPI-Matrix (alle berichteten Perioden)
+        if sel_trend in result.trends:
+            plot_data = result.trends[sel_trend]
+        else:
+            plot_data = result.kpi_matrix.loc[sel_trend][::-1] * (100 if sel_trend in PERCENT_KPIS else 1)
+        years = [str(d.year) for d in plot_data.index] if hasattr(plot_data.index, "__iter__") else []
+
+        fig_t = go.Figure(go.Bar(x=years, y=plot_data.values, marker_color='#FFD700'))
+        fig_t.update_layout(template="plotly_dark", height=250, xaxis=dict(type='category'))
+        if sel_trend in PERCENT_KPIS:
+            fig_t.update_yaxes(ticksuffix="%")
+        st.plotly_chart(fig_t, use_container_width=True)
+
+    # Erklärung + Wiki-Link zur ausgewählten Trendmetrik
+    st.caption(f"**{sel_trend}:** " + caption_with_wiki(KPI_DOC_KEYS.get(sel_trend, sel_trend)))
+
+    if not result.kpi_matrix.empty:
+        with st.expander("📋 Alle Kennzahlen je Periode"):
+            kpi_view = result.kpi_matrix.copy()
+            kpi_view.loc[list(PERCENT_KPIS)] *= 100
+            kpi_view.columns = [str(d.date()) for d in kpi_view.columns]
+            st.dataframe(kpi_view.round(2), use_container_width=True)
+            st.caption("Margen, EK-Rendite und Wachstum in %. KGV/KBV mit dem Schlusskurs am Bilanzstichtag.")
+
+def _timed_export(ticker, version, fmt):
+    with METRICS.stage("zip_export"):
+        return get_export(ticker, version, fmt)
+
+@st.fragment
+def export_section(ticker, version):
+    fmt = st.radio("Export-Format", ["CSV", "Parquet"], horizontal=True).lower()
+    # Das ZIP entsteht erst beim Klick (Callable läuft in eigenem Thread) und wird je Datenstand gecacht
+    st.download_button("🏆 KI-ANALYSE DATEN (ZIP) LADEN", lambda: _timed_export(ticker, version, fmt),
+                       f"Ares_{ticker}_{fmt}.zip", mime="application/zip")
+    st.caption("Enthält GuV, Bilanz, Cashflow, die komplette Kurshistorie und die FX-Reihe zum EUR.")
+
+# Debug-Panel mit Messwerten: ?debug=1 an die URL hängen
+debug = st.query_params.get("debug") == "1"
+
+if ticker_input and not symbols.accepts(ticker_input):
+    # Sicher unbekanntes Symbol: abweisen, bevor irgendein Abruf ans Netz geht
+    METRICS.event("symbols", "rejected")
+    st.error(f"„{ticker_input}“ ist kein bekanntes Tickersymbol – bitte einen Vorschlag wählen.")
+    ticker_input = ""
+
 if ticker_input:
     try:
-        with st.spinner("Analysiere Daten..."):
-            hist_full, info, inc, bal, cf, earn_date = get_clean_data(ticker_input)
+        with st.spinner("Analysiere Daten..."), METRICS.stage("page"):
+            with METRICS.stage("data_fetch"):
+                entry = get_clean_data(ticker_input)
+            data = entry.value
+            hist_full = data.hist
 
             if hist_full.empty:
                 st.error("Ticker-Daten konnten nicht geladen werden.")
                 st.stop()
 
+            warmer.popularity.note(ticker_input)
+            if data.errors:
+                st.warning("Teilweise unvollständig – nicht geladen: " + ", ".join(data.errors))
+
+            # Die gesamte Rechnung passiert im Analyse-Kern, die Seite stellt nur das Ergebnis dar
+            try:
+                with METRICS.stage("fx_rate"):
+                    ex_rate, fx_error = get_exchange_rate(data.info.get('currency', 'USD'), "EUR"), None
+            except FxError as e:
+                ex_rate, fx_error = None, str(e)
+            with METRICS.stage("analyze"):
+                result = get_analysis(ticker_input, entry.fetched_at, acc_eur, risk_p, overnight, ex_rate, fx_error)
+
             # --- 1. HERO SECTION: AKTIENKURS & ZEITRAUM ---
             st.write("---")
-            curr_p = hist_full['Close'].iloc[-1]
-            prev_p = hist_full['Close'].iloc[-2]
-            pct_ch = ((curr_p - prev_p) / prev_p) * 100
-            curr_sym = info.get('currency', 'USD')
+            curr_p = result.price
+            pct_ch = result.change_pct
+            curr_sym = result.currency
 
             col_hero1, col_hero2 = st.columns([1, 2])
             with col_hero1:
-                st.metric(info.get('shortName', ticker_input), f"{curr_p:.2f} {curr_sym}", f"{pct_ch:.2f}%")
-                st.caption("**Aktienkurs:** " + caption_with_wiki("Aktienkurs"))
-                st.caption("**Tagesänderung:** " + caption_with_wiki("Tagesänderung"))
+                st.metric(result.name, f"{curr_p:.2f} {curr_sym}", f"{pct_ch:.2f}%")
 
             with col_hero2:
-                period = st.radio("Chart-Zeitraum", ["1T", "1W", "1M", "6M", "1J", "5J", "Max"], horizontal=True, index=4)
-
-            # Chart Logik (skaliert)
-            p_map = {"1T":"1d","1W":"5d","1M":"1mo","6M":"6mo","1J":"1y","5J":"5y","Max":"max"}
-            i_map = {"1T":"5m","1W":"15m","1M":"1d","6M":"1d","1J":"1d","5J":"1wk","Max":"1mo"}
+                st.caption("**Aktienkurs:** " + caption_with_wiki("Aktienkurs"))
+                st.caption("**Tagesänderung:** " + caption_with_wiki("Tagesänderung"))
+                st.caption(f"Datenstand: vor {entry.age / 60:.0f} min" + (" · Aktualisierung läuft im Hintergrund…" if entry.refreshing else ""))
 
-            # Sub-Select für den Chart-Zeitraum
-            # FIX: Ticker.history statt download verwenden, um MultiIndex-Probleme (einzelner Punkt) zu vermeiden
-            hist_chart = yf.Ticker(ticker_input).history(period=p_map[period], interval=i_map[period])
+            with st.expander("⏱️ Ladezeiten je Datenbaustein"):
+                for part, sec in data.timings.items():
+                    err = data.errors.get(part)
+                    st.write(f"- **{part}:** {sec:.2f}s" + (f" → ⚠️ {err}" if err else ""))
 
-            fig = go.Figure(go.Scatter(x=hist_chart.index, y=hist_chart['Close'], line=dict(color='#FFD700'), fill='tozeroy', fillcolor='rgba(255, 215, 0, 0.1)'))
-            fig.update_yaxes(range=[hist_chart['Close'].min()*0.95, hist_chart['Close'].max()*1.3])
-            fig.update_layout(template="plotly_dark", height=300, margin=dict(l=0,r=0,t=0,b=0), xaxis_rangeslider_visible=False)
-            st.plotly_chart(fig, use_container_width=True)
+            chart_section(ticker_input, entry.fetched_at)
 
             # --- 2. AMPEL (SAFETY CHECK) ---
             st.subheader("🛡️ Trade-Safety Analyse")
-            vol_20d = hist_full['Volume'].tail(20).mean()
-            days_to_earn = (earn_date.date() - datetime.now().date()).days if earn_date else None
-
-            status = "GRÜN"
-            reasons = []
-            if days_to_earn is not None and days_to_earn <= (7 if overnight else 3):
-                status = "ROT"; reasons.append(f"⚠️ **Earnings:** In {days_to_earn} Tagen. Vorsicht vor Gaps!")
-            if vol_20d < 500000:
-                status = "ROT"; reasons.append("⚠️ **Liquidität:** Geringes Volumen (< 500k).")
+            safety = result.safety
+            vol_20d, days_to_earn = safety.vol_20d, safety.days_to_earn
+            status, reasons = safety.status, safety.reasons
 
             if status == "ROT": st.error(f"🔴 KRITISCHES RISIKO: {status}")
             else: st.success(f"🟢 HANDELBAR: {status}")
@@ -269,193 +503,197 @@ if ticker_input:
             # --- 3. POSITIONSRECHNER & ERKLÄRUNG ---
             st.write("---")
             st.subheader("📏 Positionsrechner")
-            ex_rate = get_exchange_rate(curr_sym, "EUR")
-            risk_eur = acc_eur * (risk_p / 100)
-
-            h, l, c = hist_full["High"].tail(100), hist_full["Low"].tail(100), hist_full["Close"].tail(100)
-            tr = pd.concat([(h-l).abs(), (h-c.shift(1)).abs(), (l-c.shift(1)).abs()], axis=1).max(axis=1)
-            atr_val = tr.rolling(14).mean().iloc[-1]
-            stop_pct = (atr_val / curr_p) * 1.5 * 100
-            shares = floor((risk_eur / ex_rate) / (curr_p * stop_pct / 100))
-
-            c_s1, c_s2, c_s3 = st.columns(3)
-            c_s1.metric("Stückzahl", f"{shares}")
-            c_s1.caption("**Positionsgröße:** " + caption_with_wiki("Positionsgröße"))
-
-            c_s2.metric("Stop-Abstand", f"{stop_pct:.2f}%")
-            c_s2.caption("**Stop-Loss:** " + caption_with_wiki("Stop-Loss"))
-            c_s2.caption("**ATR:** " + caption_with_wiki("ATR"))
-
-            c_s3.metric("Stop-Preis", f"{(curr_p * (1-stop_pct/100)):.2f} {curr_sym}")
-            c_s3.caption("**Stop-Loss:** " + caption_with_wiki("Stop-Loss"))
-
-            st.markdown(f"""
-            <div class="lexikon-box">
-            <b>Was bedeuten diese Zahlen?</b><br>
-            • <b>Stückzahl:</b> Kaufen Sie maximal <b>{shares}</b> Stück, sodass Ihr rechnerisches Risiko pro Trade ≈ <b>{risk_eur:.2f} EUR</b> bleibt.<br>
-            • <b>Stop-Abstand:</b> Default-Stop basiert auf Volatilität: <b>Stop-Abstand = 1,5 × ATR% (14)</b>.<br>
-            • <b>Stop-Preis:</b> Bei einer Long-Position wäre das rechnerisch <b>Close × (1 − Stop%)</b>.<br>
-            </div>
-            """, unsafe_allow_html=True)
-
-            with st.expander("📌 Positionsrechner: genaue Erklärung (Formeln, Währung, Annahmen)"):
-                st.markdown("**1) Risikobudget (EUR)**")
-                st.write(
-                    f"- Kontogröße = **{acc_eur:.2f} EUR**\n"
-                    f"- Risiko pro Trade = **{risk_p:.2f}%**\n"
-                    f"- Risikobudget = Kontogröße × Risiko% = **{risk_eur:.2f} EUR** "
-                    f"({caption_with_wiki('Risikomanagement')})"
-                )
-
-                st.markdown("**2) Währungsumrechnung (falls Aktie nicht in EUR notiert)**")
-                st.write(
-                    f"- Handelswährung laut yfinance: **{curr_sym}**\n"
-                    f"- Verwendeter Wechselkurs {curr_sym}→EUR: **{ex_rate:.6f}**\n"
-                    f"- Um das EUR-Risikobudget in Handelswährung zu bekommen: **Risikobudget_{curr_sym} = RisikoEUR / Wechselkurs**\n\n"
-                    f"{caption_with_wiki('Wechselkurs')}"
-                )
-
-                st.markdown("**3) Volatilitätsbasierter Stop (ATR)**")
-                st.write(
-                    "- **True Range (TR)** pro Tag ist das Maximum aus:\n"
-                    "  - |High − Low|\n"
-                    "  - |High − PrevClose|\n"
-                    "  - |Low − PrevClose|\n"
-                    "- **ATR(14)** ist der gleitende Durchschnitt der TR über 14 Tage.\n"
-                    "- In dieser App: Stop-Abstand = **1,5 × ATR** relativ zum aktuellen Kurs.\n"
-                    f"- Aktueller ATR-Wert (Preis-Einheiten): **{atr_val:.6f} {curr_sym}**\n"
-                    f"- Stop-Abstand% = (ATR / Close) × 1,5 × 100 = **{stop_pct:.2f}%**\n\n"
-                    f"{caption_with_wiki('ATR')}"
-                )
-
-                st.markdown("**4) Stop-Abstand je Aktie (in Handelswährung)**")
-                stop_dist_ccy = curr_p * (stop_pct / 100)
-                st.write(
-                    f"- Letzter Kurs (Close): **{curr_p:.4f} {curr_sym}**\n"
-                    f"- Stop-Abstand je Aktie = Close × Stop% = **{stop_dist_ccy:.6f} {curr_sym}**\n"
-                    f"{caption_with_wiki('Stop-Loss')}"
-                )
-
-                st.markdown("**5) Stückzahl (Position Size)**")
-                risk_ccy = (risk_eur / ex_rate)
-                st.write(
-                    f"- Risikobudget in Handelswährung ≈ **{risk_ccy:.6f} {curr_sym}**\n"
-                    f"- Stückzahl = floor( Risikobudget_{curr_sym} / Stop-Abstand_{curr_sym} )\n"
-                    f"- Stückzahl = floor( {risk_ccy:.6f} / {stop_dist_ccy:.6f} ) = **{shares}**\n\n"
-                    f"{caption_with_wiki('Positionsgröße')}"
-                )
-
-                st.markdown("**6) Stop-Preis (Long-Annahme)**")
-                stop_price_calc = curr_p * (1 - stop_pct/100)
-                st.write(
-                    f"- Stop-Preis (Long-Logik) = Close × (1 − Stop%) = **{stop_price_calc:.4f} {curr_sym}**\n"
-                    "- Hinweis: Das ist eine *rechnerische* Stop-Preis-Näherung. In der Praxis können Gaps/Slippage auftreten."
-                )
-
-                st.markdown("**Wichtige Annahmen / Grenzen**")
-                st.write(
-                    "- Der Rechner ist **kein Buy/Sell** und **keine Anlageberatung**.\n"
-                    "- Es wird **Long-Logik** angenommen (Stop unter dem aktuellen Kurs).\n"
-                    "- ATR/Volatilität ist historisch — künftige Bewegungen können abweichen.\n"
-                    "- Bei illiquiden Werten können Ausführungspreise vom Stop abweichen."
-                )
-
-                st.markdown("**Weiterführende Wikipedia-Links**")
-                st.markdown(
-                    f"- {caption_with_wiki('ATR')}\n"
-                    f"- {caption_with_wiki('Stop-Loss')}\n"
-                    f"- {caption_with_wiki('Limit-Order')}\n"
-                    f"- {caption_with_wiki('Risikomanagement')}\n"
-                    f"- {caption_with_wiki('Positionsgröße')}\n"
-                    f"- {caption_with_wiki('Wechselkurs')}"
-                )
+            pos = result.position
+            if pos.fx_error:
+                st.error(f"Wechselkurs {curr_sym}→EUR nicht verfügbar ({pos.fx_error}). Positionsgröße wird nicht berechnet.")
+
+            if pos.shares is not None:
+                risk_eur, ex_rate = pos.risk_eur, pos.ex_rate
+                atr_val, stop_pct, shares = pos.atr, pos.stop_pct, pos.shares
+
+                c_s1, c_s2, c_s3 = st.columns(3)
+                c_s1.metric("Stückzahl", f"{shares}")
+                c_s1.caption("**Positionsgröße:** " + caption_with_wiki("Positionsgröße"))
+
+                c_s2.metric("Stop-Abstand", f"{stop_pct:.2f}%")
+                c_s2.caption("**Stop-Loss:** " + caption_with_wiki("Stop-Loss"))
+                c_s2.caption("**ATR:** " + caption_with_wiki("ATR"))
+
+                c_s3.metric("Stop-Preis", f"{pos.stop_price:.2f} {curr_sym}")
+                c_s3.caption("**Stop-Loss:** " + caption_with_wiki("Stop-Loss"))
+
+                st.markdown(f"""
+                <div class="lexikon-box">
+                <b>Was bedeuten diese Zahlen?</b><br>
+                • <b>Stückzahl:</b> Kaufen Sie maximal <b>{shares}</b> Stück, sodass Ihr rechnerisches Risiko pro Trade ≈ <b>{risk_eur:.2f} EUR</b> bleibt.<br>
+                • <b>Stop-Abstand:</b> Default-Stop basiert auf Volatilität: <b>Stop-Abstand = 1,5 × ATR% (14)</b>.<br>
+                • <b>Stop-Preis:</b> Bei einer Long-Position wäre das rechnerisch <b>Close × (1 − Stop%)</b>.<br>
+                </div>
+                """, unsafe_allow_html=True)
+
+                with st.expander("📌 Positionsrechner: genaue Erklärung (Formeln, Währung, Annahmen)"):
+                    st.markdown("**1) Risikobudget (EUR)**")
+                    st.write(
+                        f"- Kontogröße = **{acc_eur:.2f} EUR**\n"
+                        f"- Risiko pro Trade = **{risk_p:.2f}%**\n"
+                        f"- Risikobudget = Kontogröße × Risiko% = **{risk_eur:.2f} EUR** "
+                        f"({caption_with_wiki('Risikomanagement')})"
+                    )
+
+                    st.markdown("**2) Währungsumrechnung (falls Aktie nicht in EUR notiert)**")
+                    st.write(
+                        f"- Handelswährung laut yfinance: **{curr_sym}**\n"
+                        f"- Verwendeter Wechselkurs {curr_sym}→EUR: **{ex_rate:.6f}**\n"
+                        f"- Um das EUR-Risikobudget in Handelswährung zu bekommen: **Risikobudget_{curr_sym} = RisikoEUR / Wechselkurs**\n\n"
+                        f"{caption_with_wiki('Wechselkurs')}"
+                    )
+
+                    st.markdown("**3) Volatilitätsbasierter Stop (ATR)**")
+                    st.write(
+                        "- **True Range (TR)** pro Tag ist das Maximum aus:\n"
+                        "  - |High − Low|\n"
+                        "  - |High − PrevClose|\n"
+                        "  - |Low − PrevClose|\n"
+                        "- **ATR(14)** ist der gleitende Durchschnitt der TR über 14 Tage.\n"
+                        "- In dieser App: Stop-Abstand = **1,5 × ATR** relativ zum aktuellen Kurs.\n"
+                        f"- Aktueller ATR-Wert (Preis-Einheiten): **{atr_val:.6f} {curr_sym}**\n"
+                        f"- Stop-Abstand% = (ATR / Close) × 1,5 × 100 = **{stop_pct:.2f}%**\n\n"
+                        f"{caption_with_wiki('ATR')}"
+                    )
+
+                    st.markdown("**4) Stop-Abstand je Aktie (in Handelswährung)**")
+                    stop_dist_ccy = curr_p * (stop_pct / 100)
+                    st.write(
+                        f"- Letzter Kurs (Close): **{curr_p:.4f} {curr_sym}**\n"
+                        f"- Stop-Abstand je Aktie = Close × Stop% = **{stop_dist_ccy:.6f} {curr_sym}**\n"
+                        f"{caption_with_wiki('Stop-Loss')}"
+                    )
+
+                    st.markdown("**5) Stückzahl (Position Size)**")
+                    risk_ccy = (risk_eur / ex_rate)
+                    st.write(
+                        f"- Risikobudget in Handelswährung ≈ **{risk_ccy:.6f} {curr_sym}**\n"
+                        f"- Stückzahl = floor( Risikobudget_{curr_sym} / Stop-Abstand_{curr_sym} )\n"
+                        f"- Stückzahl = floor( {risk_ccy:.6f} / {stop_dist_ccy:.6f} ) = **{shares}**\n\n"
+                        f"{caption_with_wiki('Positionsgröße')}"
+                    )
+
+                    st.markdown("**6) Stop-Preis (Long-Annahme)**")
+                    st.write(
+                        f"- Stop-Preis (Long-Logik) = Close × (1 − Stop%) = **{pos.stop_price:.4f} {curr_sym}**\n"
+                        "- Hinweis: Das ist eine *rechnerische* Stop-Preis-Näherung. In der Praxis können Gaps/Slippage auftreten."
+                    )
+
+                    st.markdown("**Wichtige Annahmen / Grenzen**")
+                    st.write(
+                        "- Der Rechner ist **kein Buy/Sell** und **keine Anlageberatung**.\n"
+                        "- Es wird **Long-Logik** angenommen (Stop unter dem aktuellen Kurs).\n"
+                        "- ATR/Volatilität ist historisch — künftige Bewegungen können abweichen.\n"
+                        "- Bei illiquiden Werten können Ausführungspreise vom Stop abweichen."
+                    )
+
+                    st.markdown("**Weiterführende Wikipedia-Links**")
+                    st.markdown(
+                        f"- {caption_with_wiki('ATR')}\n"
+                        f"- {caption_with_wiki('Stop-Loss')}\n"
+                        f"- {caption_with_wiki('Limit-Order')}\n"
+                        f"- {caption_with_wiki('Risikomanagement')}\n"
+                        f"- {caption_with_wiki('Positionsgröße')}\n"
+                        f"- {caption_with_wiki('Wechselkurs')}"
+                    )
+
+            with st.expander("🧪 Regel-Backtest: Stop & Ampel auf jedem historischen Tag"):
+                with METRICS.stage("backtest"):
+                    bt = get_backtest(ticker_input, entry.fetched_at, acc_eur, risk_p, overnight, pos.ex_rate)
+                st.dataframe(bt.round(2), hide_index=True, use_container_width=True)
+                st.caption("Einstieg zum Schlusskurs, Stop = Close − 1,5 × ATR(14), Ausstieg am Stop bzw. zum "
+                           "Eröffnungskurs bei einem Gap darunter, sonst nach 10 Handelstagen. R = Ergebnis / Stop-Abstand. "
+                           "Earnings-Sperrfristen aus allen im lokalen Index gesammelten Terminen (Zeiträume vor dem ersten "
+                           "Eintrag ohne Earnings-Prüfung); EUR mit dem heutigen Wechselkurs.")
 
             # --- 4. FUNDAMENTAL ANALYSE (9 KPIs) ---
             st.write("---")
             st.subheader("📊 Fundamental-Analyse")
-            if not inc.empty and not bal.empty:
+            kpis = result.kpis
+            if kpis:
                 f1,f2,f3 = st.columns(3); f4,f5,f6 = st.columns(3); f7,f8,f9 = st.columns(3)
-                rev = get_val(inc, ['Total Revenue']); ni = get_val(inc, ['Net Income'])
-                ebitda = get_val(inc, ['EBITDA']); eq = get_val(bal, ['Stockholders Equity'])
-                ca = get_val(bal, ['Total Current Assets']); cl = get_val(bal, ['Total Current Liabilities'])
-                debt = get_val(bal, ['Total Debt']); ta = get_val(bal, ['Total Assets'])
+                pct = lambda v: f"{v*100:.2f}%" if v is not None else "N/A"
+                ratio = lambda v: f"{v:.2f}" if v is not None else "N/A"
+                raw = lambda v: v if v is not None else "N/A"
 
-                f1.metric("Gewinnmarge", f"{(ni/rev)*100:.2f}%" if rev and ni else "N/A")
+                f1.metric("Gewinnmarge", pct(kpis["Gewinnmarge"]))
                 f1.caption(caption_with_wiki("Gewinnmarge"))
 
-                f2.metric("EBITDA-Marge", f"{(ebitda/rev)*100:.2f}%" if rev and ebitda else "N/A")
+                f2.metric("EBITDA-Marge", pct(kpis["EBITDA-Marge"]))
                 f2.caption(caption_with_wiki("EBITDA-Marge"))
 
-                f3.metric("EK-Rendite", f"{(ni/eq)*100:.2f}%" if ni and eq else "N/A")
+                f3.metric("EK-Rendite", pct(kpis["EK-Rendite"]))
                 f3.caption(caption_with_wiki("Eigenkapitalrendite"))
 
-                f4.metric("KGV (PE)", info.get('trailingPE', 'N/A'))
+                f4.metric("KGV (PE)", raw(kpis["KGV"]))
                 f4.caption(caption_with_wiki("KGV"))
 
-                f5.metric("Liquidität", f"{(ca/cl):.2f}" if ca and cl else "N/A")
+                f5.metric("Liquidität", ratio(kpis["Liquidität"]))
                 f5.caption(caption_with_wiki("Current Ratio"))
 
-                f6.metric("Verschuldung", f"{(debt/eq):.2f}" if debt and eq else "N/A")
+                f6.metric("Verschuldung", ratio(kpis["Verschuldung"]))
                 f6.caption(caption_with_wiki("Verschuldungsgrad"))
 
-                growth = "N/A"
-                try:
-                    if len(inc.columns) > 1 and 'Total Revenue' in inc.index:
-                        growth = f"{((inc.loc['Total Revenue'].iloc[0]/inc.loc['Total Revenue'].iloc[1])-1)*100:.2f}%"
-                except:
-                    growth = "N/A"
-                f7.metric("Wachstum", growth)
+                f7.metric("Wachstum", pct(kpis["Wachstum"]))
                 f7.caption(caption_with_wiki("Wachstum"))
                 f7.caption("**Umsatz:** " + caption_with_wiki("Umsatz"))
 
-                f8.metric("KBV (P/B)", info.get('priceToBook', 'N/A'))
+                f8.metric("KBV (P/B)", raw(kpis["KBV"]))
                 f8.caption(caption_with_wiki("KBV"))
 
-                f9.metric("Asset Turnover", f"{(rev/ta):.2f}" if rev and ta else "N/A")
+                f9.metric("Asset Turnover", ratio(kpis["Asset Turnover"]))
                 f9.caption(caption_with_wiki("Asset Turnover"))
 
             # --- 5. HISTORISCHE TRENDS (VON LINKS NACH RECHTS) ---
-            st.write("---")
-            st.subheader("📉 Historische Trends (Chronologisch)")
-            trend_options = ["Umsatz", "Reingewinn", "EBITDA", "Eigenkapital", "Operativer Cashflow"]
-            sel_trend = st.selectbox("Metrik wählen:", trend_options)
-
-            t_map = {
-                "Umsatz": inc.loc['Total Revenue'] if ('Total Revenue' in inc.index) else pd.Series(dtype=float),
-                "Reingewinn": inc.loc['Net Income'] if ('Net Income' in inc.index) else pd.Series(dtype=float),
-                "EBITDA": inc.loc['EBITDA'] if ('EBITDA' in inc.index) else pd.Series(dtype=float),
-                "Eigenkapital": bal.loc['Stockholders Equity'] if ('Stockholders Equity' in bal.index) else pd.Series(dtype=float),
-                "Operativer Cashflow": cf.loc['Operating Cash Flow'] if ('Operating Cash Flow' in cf.index) else pd.Series(dtype=float)
-            }
-
-            plot_data = t_map[sel_trend][::-1]
-            years = [str(d.year) for d in plot_data.index] if hasattr(plot_data.index, "__iter__") else []
-
-            fig_t = go.Figure(go.Bar(x=years, y=plot_data.values, marker_color='#FFD700'))
-            fig_t.update_layout(template="plotly_dark", height=250, xaxis=dict(type='category'))
-            st.plotly_chart(fig_t, use_container_width=True)
-
-            # Erklärung + Wiki-Link zur ausgewählten Trendmetrik
-            if sel_trend == "Umsatz":
-                st.caption("**Umsatz:** " + caption_with_wiki("Umsatz"))
-            elif sel_trend == "Reingewinn":
-                st.caption("**Reingewinn:** " + caption_with_wiki("Reingewinn"))
-            elif sel_trend == "EBITDA":
-                st.caption("**EBITDA:** " + caption_with_wiki("EBITDA"))
-            elif sel_trend == "Eigenkapital":
-                st.caption("**Eigenkapital:** " + caption_with_wiki("Eigenkapital"))
-            elif sel_trend == "Operativer Cashflow":
-                st.caption("**Operativer Cashflow:** " + caption_with_wiki("Operativer Cashflow"))
+            trend_section(result)
 
             # --- 6. EXPORT ---
-            zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, "w") as zf:
-                zf.writestr("GuV.csv", inc.to_csv()); zf.writestr("Bilanz.csv", bal.to_csv()); zf.writestr("Cashflow.csv", cf.to_csv())
-            st.download_button("🏆 KI-ANALYSE DATEN (ZIP) LADEN", zip_buffer.getvalue(), f"Ares_{ticker_input}.zip")
+            export_section(ticker_input, entry.fetched_at)
 
     except Exception as e:
         st.error(f"Fehler: {e}. Versuchen Sie es erneut.")
 
+# Messwerte als Textdatei exportieren (nur mit ARES_METRICS_FILE, höchstens alle 10 s)
+METRICS.maybe_flush()
+
+if debug:
+    with st.expander("🔧 DEBUG: MESSWERTE (prozessweit)", expanded=True):
+        stages, counters = METRICS.snapshot()
+        if stages:
+            st.dataframe(pd.DataFrame([
+                {"Stufe": name, "Anzahl": s["count"], "p50 (ms)": s["p50"] * 1e3, "p95 (ms)": s["p95"] * 1e3,
+                 "Letzte (ms)": s["last"] * 1e3}
+                for name, s in sorted(stages.items())
+            ]).round(2), hide_index=True, use_container_width=True)
+        if counters:
+            hits = pd.Series(counters).unstack(fill_value=0)
+            hits.index.name = "Cache"
+            st.dataframe(hits, use_container_width=True)
+        events = METRICS.events()
+        if events:
+            other = pd.Series(events).unstack(fill_value=0)
+            other.index.name = "Komponente"
+            st.dataframe(other, use_container_width=True)
+        cache = get_swr_cache().stats()
+        st.caption(f"Daten-Cache: {cache['entries']} Einträge, {cache['bytes'] / 2**20:.1f} MB"
+                   + (f" von {cache['max_bytes'] / 2**20:.0f} MB" if cache['max_bytes'] else "")
+                   + f", {cache['evictions']} verdrängt")
+        if warmer.last_run:
+            run = warmer.last_run
+            st.caption(f"Vorwärmen: {run['tickers']} Ticker, {run['currencies']} Währungen in {run['seconds']:.1f}s"
+                       + (f", Fehler: {', '.join(run['errors'])}" if run['errors'] else ""))
+        st.caption(f"Symbolverzeichnis: {len(symbols)} Einträge, Börsen: "
+                   + ", ".join(s or "US" for s in symbols.meta["suffixes"]))
+        index = get_earnings_index()
+        st.caption(f"Earnings-Index: {len(index)} Ticker, "
+                   + (f"Stand vor {(time.time() - index.refreshed_at) / 3600:.1f} h" if index.refreshed_at else "noch nicht geladen"))
+        st.download_button("Prometheus-Text laden", METRICS.to_prometheus(), "ares_metrics.prom")
+
 # --- DETAILLIERTES LEXIKON ---
 st.write("---")
 st.subheader("📘 Kennzahlenlexikon")
@@ -0,0 +1 @@
+"""ARES – Hilfsmodule (Datenhaltung, Berechnungen) für die Streamlit-App."""
@@ -0,0 +1,5 @@
+import sys
+
+from ares.cli import main
+
+sys.exit(main())
@@ -0,0 +1,219 @@
+"""Walk-forward-Backtest der Regeln aus Ampel und Positionsrechner auf jedem historischen Bar.
+
+Für jeden Bar t (Bars × Ticker, vollständig vektorisiert) gilt wie in der App:
+Einstieg zum Schlusskurs, Stop = Close − 1,5 × ATR(14), Stückzahl aus dem EUR-Risikobudget,
+Ampel ROT bei Ø-Volumen (20T) < VOL_MIN oder Earnings innerhalb der Sperrfrist.
+Danach wird `horizon` Bars lang geprüft, ob das Tief den Stop erreicht. Öffnet der Kurs bereits
+unter dem Stop (Gap), erfolgt der Ausstieg zum Eröffnungskurs – die Differenz ist die Slippage.
+Ohne Stop-Treffer wird zum Schlusskurs des letzten Bars verkauft.
+
+    python -m ares.backtest AAPL MSFT SAP.DE --horizon 10
+"""
+import argparse
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from ares.core import EARNINGS_DAYS, STOP_ATR_MULT, VOL_MIN
+from ares.fx import FxError, convert, fx_history
+from ares.indicators import ATR_WINDOW, atr, rolling_mean
+
+HORIZON = 10  # Haltedauer in Bars, falls der Stop nicht greift
+
+
+def _lead(x, k):
+    """Wert `k` Bars später (am Ende NaN)."""
+    out = np.full_like(x, np.nan)
+    out[:-k] = x[k:]
+    return out
+
+
+def _2d(a):
+    a = np.asarray(a, dtype=float)
+    return a[:, None] if a.ndim == 1 else a
+
+
+@dataclass
+class BacktestResult:
+    """Ergebnis je Bar und Ticker (Arrays Bars × Ticker); `summary()` verdichtet zu Kennzahlen."""
+    index: pd.DatetimeIndex
+    tickers: list
+    entry: np.ndarray
+    stop: np.ndarray
+    exit: np.ndarray
+    r: np.ndarray
+    slippage_r: np.ndarray
+    hit: np.ndarray
+    gap: np.ndarray
+    hit_bar: np.ndarray
+    trade: np.ndarray
+    green: np.ndarray
+    shares: np.ndarray
+    pnl_eur: np.ndarray
+
+    def summary(self):
+        """Kennzahlen je Ticker, getrennt nach Ampel GRÜN/ROT, plus Gesamtzeile je Ampel."""
+        rows = []
+        for status, mask in (("GRÜN", self.trade & self.green), ("ROT", self.trade & ~self.green)):
+            for name, cols in [(t, [i]) for i, t in enumerate(self.tickers)] + [("Alle", list(range(len(self.tickers))))]:
+                m = mask[:, cols]
+                n = int(m.sum())
+                if not n:
+                    continue
+                hits, gaps = self.hit[:, cols][m], self.gap[:, cols][m]
+                r, slip = self.r[:, cols][m], self.slippage_r[:, cols][m]
+                pnl = self.pnl_eur[:, cols][m]
+                rows.append({
+                    "Ticker": name, "Ampel": status, "Trades": n,
+                    "Stop-Quote %": hits.mean() * 100,
+                    "Gap-Quote %": gaps.sum() / hits.sum() * 100 if hits.any() else np.nan,
+                    "Ø Slippage (R)": slip[gaps].mean() if gaps.any() else 0.0,
+                    "Max Slippage (R)": slip.max(),
+                    "Ø R": r.mean(), "Median R": np.median(r), "Trefferquote %": (r > 0).mean() * 100,
+                    "Ø P&L EUR": np.nanmean(pnl) if np.isfinite(pnl).any() else np.nan,
+                })
+        return pd.DataFrame(rows)
+
+
+def simulate(open_, high, low, close, volume, horizon=HORIZON, blocked=None, present=None,
+             risk_eur=100.0, ex_rate=1.0, stop_mult=STOP_ATR_MULT, vol_min=VOL_MIN, window=ATR_WINDOW):
+    """Kern auf NumPy-Arrays (Bars × Ticker oder 1-D). Nur die Schleife über die `horizon` Folge-Bars
+    bleibt in Python – jede Iteration prüft alle Bars und Ticker auf einmal.
+
+    `blocked`: True, wo Earnings die Ampel auf ROT setzen; `present`: False für aufgefüllte Bars
+    (Feiertage einer Börse) – dort wird nicht eingestiegen. `ex_rate`: Währung -> EUR (Skalar oder Array).
+    """
+    o, h, l, c, v = (_2d(a) for a in (open_, high, low, close, volume))
+    n = len(c)
+    stop_dist = stop_mult * atr(h, l, c, window)
+    stop = c - stop_dist
+    # Ø-Volumen nur über vorhandene Bars (Feiertage = NaN), bewertbar ab 20 eigenen Handelstagen
+    vol20 = rolling_mean(v, 20, min_periods=1)
+    vol20[np.cumsum(np.isfinite(v), axis=0) < 20] = np.nan
+    with np.errstate(invalid="ignore"):
+        green = vol20 >= vol_min
+    if blocked is not None:
+        green &= ~_2d(blocked).astype(bool)
+
+    complete = (np.arange(n) < n - horizon)[:, None]
+    # Erst ab 20 Bars Volumen-Historie bewertbar – davor wäre die Ampel ROT ohne geprüfte Liquidität
+    trade = np.isfinite(stop_dist) & (stop_dist > 0) & np.isfinite(vol20) & complete
+    if present is not None:
+        trade &= _2d(present).astype(bool)
+
+    exit_ = np.full_like(c, np.nan)
+    hit_bar = np.zeros(c.shape, dtype=np.int16)
+    gap = np.zeros(c.shape, dtype=bool)
+    pending = trade.copy()
+    for k in range(1, horizon + 1):
+        with np.errstate(invalid="ignore"):
+            low_k, open_k = _lead(l, k), _lead(o, k)
+            hit = pending & (low_k <= stop)
+            gapped = hit & (open_k <= stop)
+        exit_[hit] = np.where(gapped, open_k, stop)[hit]
+        gap |= gapped
+        hit_bar[hit] = k
+        pending &= ~hit
+    exit_[pending] = _lead(c, horizon)[pending]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r = np.where(trade, (exit_ - c) / stop_dist, np.nan)
+        slippage_r = np.where(gap, (stop - exit_) / stop_dist, 0.0)
+        rate = np.broadcast_to(np.asarray(ex_rate, dtype=float), c.shape)
+        shares = np.floor((risk_eur / rate) / stop_dist)
+        pnl_eur = np.where(trade, shares * (exit_ - c) * rate, np.nan)
+    return dict(entry=c, stop=stop, exit=exit_, r=r, slippage_r=slippage_r, hit=hit_bar > 0, gap=gap,
+                hit_bar=hit_bar, trade=trade, green=green, shares=shares, pnl_eur=pnl_eur)
+
+
+def align(hists):
+    """Ticker -> Historie  =>  gemeinsames Tagesraster (Felder als DataFrames Datum × Ticker).
+
+    Handelsfreie Tage einer Börse werden mit dem letzten Schlusskurs aufgefüllt (Spanne 0) und als nicht
+    vorhanden markiert, damit ATR-Fenster nicht an fremden Feiertagen abreißen. Das Volumen bleibt dort
+    NaN – eine 0 würde den Volumen-Schnitt drücken und die Ampel fälschlich auf ROT setzen.
+    """
+    def naive(h):
+        index = h.index.tz_localize(None) if h.index.tz is not None else h.index
+        return h.set_axis(index.normalize())
+
+    frames = {t: naive(h) for t, h in hists.items() if not h.empty}
+    close = pd.DataFrame({t: h["Close"] for t, h in frames.items()}).sort_index()
+    present = close.notna()
+    close = close.ffill()
+    fields = {"Close": close, "Volume": pd.DataFrame({t: h["Volume"] for t, h in frames.items()}).reindex(close.index)}
+    for col in ("Open", "High", "Low"):
+        fields[col] = pd.DataFrame({t: h[col] for t, h in frames.items()}).reindex(close.index).fillna(close)
+    return fields, present
+
+
+def earnings_mask(index, tickers, earnings, overnight=True):
+    """True, wo ein Earnings-Termin innerhalb der Sperrfrist nach dem Bar liegt (wie `assess_safety`)."""
+    days = EARNINGS_DAYS[overnight]
+    dates = index.values.astype("datetime64[D]")
+    out = np.zeros((len(index), len(tickers)), dtype=bool)
+    for j, t in enumerate(tickers):
+        events = np.sort(np.asarray(pd.to_datetime(list(earnings.get(t, []))).values, dtype="datetime64[D]"))
+        if not len(events):
+            continue
+        pos = np.searchsorted(events, dates, side="left")
+        nxt = events[np.clip(pos, 0, len(events) - 1)]
+        out[:, j] = (pos < len(events)) & ((nxt - dates).astype(int) <= days)
+    return out
+
+
+def backtest(hists, horizon=HORIZON, acc_eur=10000, risk_p=1.0, overnight=True, currencies=None, fx=None,
+             earnings=None, ex_rate=1.0):
+    """Backtest über viele Ticker. `currencies`/`fx` (Datum × Währung, aus `fx_history`) rechnen mit dem
+    Tageskurs in EUR, sonst gilt der feste Kurs `ex_rate`; ohne FX-Kurs bleibt der EUR-P&L leer.
+    R-Multiples sind währungsunabhängig."""
+    fields, present = align(hists)
+    tickers = list(fields["Close"].columns)
+    index = fields["Close"].index
+    if currencies and fx is not None:
+        ones = pd.DataFrame(1.0, index=index, columns=tickers)
+        ex_rate = convert(ones, {t: currencies.get(t, "EUR") for t in tickers}, fx).to_numpy()
+    blocked = earnings_mask(index, tickers, earnings, overnight) if earnings else None
+    out = simulate(*(fields[c].to_numpy() for c in ("Open", "High", "Low", "Close", "Volume")),
+                   horizon=horizon, blocked=blocked, present=present.to_numpy(),
+                   risk_eur=acc_eur * risk_p / 100, ex_rate=ex_rate)
+    return BacktestResult(index=index, tickers=tickers, **out)
+
+
+def main(argv=None):
+    from ares.core import load_ticker_data
+    from ares.earnings import EarningsIndex
+    from ares.screener import parse_tickers
+    from ares.store import PriceStore
+
+    parser = argparse.ArgumentParser(prog="python -m ares.backtest", description="Backtest von ATR-Stop und Ampel.")
+    parser.add_argument("tickers", nargs="+")
+    parser.add_argument("--horizon", type=int, default=HORIZON, help="Haltedauer in Bars ohne Stop-Treffer")
+    parser.add_argument("--account", type=float, default=10000)
+    parser.add_argument("--risk", type=float, default=1.0)
+    parser.add_argument("--intraday", action="store_true")
+    args = parser.parse_args(argv)
+
+    store, index = PriceStore(), EarningsIndex()
+    tickers = parse_tickers(" ".join(args.tickers))
+    index.refresh(tickers=tickers)
+    data = {t: load_ticker_data(t, store, earnings=index) for t in tickers}
+    currencies = {t: d.info.get("currency", "USD") for t, d in data.items()}
+    try:
+        fx = fx_history(set(currencies.values()), period="max")
+    except FxError as e:
+        print(f"Ohne EUR-Umrechnung: {e}", file=sys.stderr)
+        fx = None
+    # Alle im Index gesammelten Termine, auch vergangene -> Sperrfristen über die ganze Historie
+    earnings = {t: index.dates(t) for t in data}
+    result = backtest({t: d.hist for t, d in data.items()}, args.horizon, args.account, args.risk,
+                      not args.intraday, currencies, fx, earnings)
+    with pd.option_context("display.width", 200, "display.max_columns", 20):
+        print(result.summary().round(2).to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
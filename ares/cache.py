@@ -0,0 +1,220 @@
+"""Prozessweiter Cache mit Stale-While-Revalidate, gezielter Invalidierung je Schlüssel und Byte-Budget (LRU)."""
+import dataclasses
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+# Nach einem fehlgeschlagenen Hintergrund-Refresh frühestens nach so vielen Sekunden erneut versuchen
+RETRY_AFTER = 60
+# Speicher-Budget des Caches; 0 = unbegrenzt
+MAX_BYTES = int(os.environ.get("ARES_CACHE_MB", "512")) * 2**20
+
+
+def estimate_size(obj):
+    """Ungefährer Speicherbedarf in Bytes (DataFrames inkl. Strings, Dataclasses/Container rekursiv)."""
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(obj, pd.DataFrame) else usage)
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return sum(estimate_size(getattr(obj, f.name)) for f in dataclasses.fields(obj))
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_size(k) + estimate_size(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set)):
+        return sys.getsizeof(obj) + sum(estimate_size(v) for v in obj)
+    return sys.getsizeof(obj)
+
+
+class SingleFlight:
+    """Gleichzeitige Aufrufe mit demselben Schlüssel teilen sich eine Ausführung (und deren Ergebnis/Fehler)."""
+
+    def __init__(self, metrics=None):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._metrics = metrics
+
+    def do(self, key, fn):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            if self._metrics is not None:
+                self._metrics.event("singleflight", "shared")
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+@dataclass
+class Entry:
+    value: object
+    fetched_at: float
+    refreshing: bool = False
+    failed_at: float = 0.0
+    size: int = 0
+    incomplete: bool = False  # gilt schon nach RETRY_AFTER Sekunden als abgelaufen statt erst nach der TTL
+
+    @property
+    def age(self):
+        return time.time() - self.fetched_at
+
+    def expired(self, ttl):
+        return self.age > (min(ttl, RETRY_AFTER) if self.incomplete else ttl)
+
+
+class SWRCache:
+    """Liefert vorhandene Werte immer sofort aus.
+
+    Ist ein Eintrag älter als `ttl`, wird er trotzdem zurückgegeben und parallel im Hintergrund neu
+    geladen – niemand wartet auf einen Refresh, den er nicht angestoßen hat. Nur ein fehlender
+    Eintrag wird synchron geladen.
+
+    Übersteigt die Summe der Einträge `max_bytes`, fliegen die am längsten nicht gelesenen raus (LRU).
+
+    `incomplete(value)` erkennt unvollständig geladene Werte: sie werden ausgeliefert, aber schon nach
+    RETRY_AFTER Sekunden neu geladen (nicht erst nach der TTL, aber auch nicht bei jedem Zugriff).
+    """
+
+    def __init__(self, max_workers=4, metrics=None, max_bytes=MAX_BYTES, sizeof=estimate_size):
+        self._entries = OrderedDict()
+        self._metrics = metrics
+        self._max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._bytes = 0
+        self._evictions = 0
+        self._flight = SingleFlight(metrics)
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ares-swr")
+
+    def get(self, key, loader, ttl, incomplete=None):
+        t0 = time.perf_counter()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None:
+            # Mehrere Sessions, die denselben fehlenden Schlüssel anfragen, warten auf genau einen Ladevorgang
+            entry, result = self._flight.do(key, lambda: self._load(key, loader, incomplete)), "miss"
+        elif entry.expired(ttl):
+            self._refresh(key, entry, loader, incomplete)
+            result = "stale"
+        else:
+            result = "hit"
+        if self._metrics is not None:
+            # Cache-Name = erstes Schlüsselelement ("data", "fx", ...)
+            name = key[0] if isinstance(key, tuple) else str(key)
+            self._metrics.count(name, result, time.perf_counter() - t0)
+        return entry
+
+    def warm(self, key, loader, max_age, incomplete=None):
+        """Lädt synchron (im Thread des Aufrufers), falls der Eintrag fehlt oder älter als `max_age` ist.
+
+        Für Vorwärm-Jobs: der Eintrag wird ersetzt, bevor Nutzer ihn als veraltet sehen.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and not entry.expired(max_age):
+            return entry
+        return self._flight.do(key, lambda: self._put(key, loader(), incomplete))
+
+    def _load(self, key, loader, incomplete=None):
+        # Ein Nachzügler könnte erst nach dem Ende eines Ladevorgangs eintreffen -> erneut nachsehen
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry if entry is not None else self._put(key, loader(), incomplete)
+
+    def peek(self, key):
+        with self._lock:
+            return self._entries.get(key)
+
+    def invalidate(self, where):
+        """Entfernt alle Einträge, deren Schlüssel `where(key)` erfüllt. Rückgabe: Anzahl."""
+        with self._lock:
+            keys = [k for k in self._entries if where(k)]
+            for k in keys:
+                self._bytes -= self._entries.pop(k).size
+        self._report()
+        return len(keys)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "max_bytes": self._max_bytes,
+                    "evictions": self._evictions}
+
+    def _entry(self, value, incomplete):
+        return Entry(value, time.time(), size=self._sizeof(value),
+                     incomplete=bool(incomplete is not None and incomplete(value)))
+
+    def _put(self, key, value, incomplete=None):
+        entry = self._entry(value, incomplete)
+        with self._lock:
+            self._store(key, entry)
+        self._report()
+        return entry
+
+    def _store(self, key, entry):
+        """Setzt den Eintrag (Lock wird gehalten) und verdrängt ältere, bis das Budget passt."""
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.size
+        self._entries[key] = entry
+        self._bytes += entry.size
+        # Der gerade eingefügte Eintrag bleibt immer, auch wenn er allein das Budget sprengt
+        while self._max_bytes and self._bytes > self._max_bytes and len(self._entries) > 1:
+            old_key, old = self._entries.popitem(last=False)
+            self._bytes -= old.size
+            self._evictions += 1
+            if self._metrics is not None:
+                self._metrics.count(old_key[0] if isinstance(old_key, tuple) else str(old_key), "evicted")
+
+    def _report(self):
+        if self._metrics is not None:
+            stats = self.stats()
+            self._metrics.gauge("cache_bytes", stats["bytes"])
+            self._metrics.gauge("cache_entries", stats["entries"])
+
+    def _refresh(self, key, entry, loader, incomplete=None):
+        with self._lock:
+            if entry.refreshing or time.time() - entry.failed_at < RETRY_AFTER:
+                return
+            entry.refreshing = True
+        self._pool.submit(self._run_refresh, key, entry, loader, incomplete)
+
+    def _run_refresh(self, key, entry, loader, incomplete=None):
+        try:
+            value = loader()
+        except Exception:
+            log.exception("Hintergrund-Refresh für %r fehlgeschlagen", key)
+            with self._lock:
+                entry.refreshing = False
+                entry.failed_at = time.time()
+            return
+        fresh = self._entry(value, incomplete)
+        with self._lock:
+            entry.refreshing = False
+            # Wurde der Eintrag inzwischen invalidiert oder verdrängt, nicht wieder einsetzen
+            if self._entries.get(key) is entry:
+                self._store(key, fresh)
+        self._report()
@@ -0,0 +1,81 @@
+"""Kursdaten für den Chart: Tages-Zeiträume lokal aus der Historie, nur Intraday über das Netz.
+
+Lange Reihen werden per LTTB auf ein festes Punkt-Budget reduziert, damit die Chart-Nutzlast
+unabhängig von der Historienlänge bleibt.
+"""
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# Intraday-Zeiträume brauchen eigene Bars von Yahoo: Zeitraum -> (period, interval)
+INTRADAY = {"1T": ("1d", "5m"), "1W": ("5d", "15m")}
+
+# Tagesdaten: Zeitraum -> Zeitfenster (None = ganze Historie).
+# Alle Zeiträume bleiben täglich – das Punkt-Budget (LTTB) ersetzt die Wochen-/Monatsaggregation und
+# erhält dabei Ausreißer, die ein Monats-Schlusskurs verschlucken würde.
+LOCAL = {
+    "1M": pd.DateOffset(months=1),
+    "6M": pd.DateOffset(months=6),
+    "1J": pd.DateOffset(years=1),
+    "5J": pd.DateOffset(years=5),
+    "Max": None,
+}
+
+# Punkte je Chart: etwa die Pixelbreite des Plots im zentrierten Layout
+CHART_WIDTH = 700
+# Ab so vielen Punkten rendert der Browser per WebGL statt SVG
+GL_THRESHOLD = 500
+
+def chart_history(hist, period):
+    """Schneidet die vorhandene Tages-Historie auf einen der lokalen Chart-Zeiträume zu."""
+    window = LOCAL[period]
+    if hist.empty or window is None:
+        return hist
+    return hist[hist.index > hist.index[-1] - window]
+
+
+def lttb(x, y, n):
+    """Largest-Triangle-Three-Buckets: Indizes von `n` Punkten, die die Form der Linie erhalten.
+
+    Erster und letzter Punkt bleiben; aus jedem Bucket dazwischen wird der Punkt gewählt, der mit dem
+    zuletzt gewählten Punkt und dem Mittel des nächsten Buckets das größte Dreieck bildet.
+    """
+    size = len(x)
+    if n >= size or n < 3:
+        return np.arange(size)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, size - 1, n - 1).astype(np.int64)
+    out = np.empty(n, dtype=np.int64)
+    out[0], out[-1] = 0, size - 1
+    a = 0
+    for i in range(n - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (size - 1, size)
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def downsample(hist, max_points=CHART_WIDTH):
+    """Reduziert die Historie auf höchstens `max_points` Bars (Auswahl nach dem Schlusskurs)."""
+    close = hist["Close"].dropna()
+    if len(close) <= max_points:
+        return hist.loc[close.index]
+    idx = lttb(close.index.asi8, close.to_numpy(), max_points)
+    return hist.loc[close.index[idx]]
+
+
+def price_figure(hist, width=CHART_WIDTH):
+    """Fertige Kurs-Figur: Achsenbereich aus allen Bars, gezeichnet wird die reduzierte Reihe."""
+    lo, hi = hist["Close"].min(), hist["Close"].max()
+    points = downsample(hist, width)
+    trace = go.Scattergl if len(points) > GL_THRESHOLD else go.Scatter
+    fig = go.Figure(trace(x=points.index, y=points["Close"], line=dict(color="#FFD700"), fill="tozeroy",
+                          fillcolor="rgba(255, 215, 0, 0.1)"))
+    fig.update_yaxes(range=[lo * 0.95, hi * 1.3])
+    fig.update_layout(template="plotly_dark", height=300, margin=dict(l=0, r=0, t=0, b=0),
+                      xaxis_rangeslider_visible=False)
+    return fig
@@ -0,0 +1,129 @@
+"""Batch-Lauf ohne Browser/Streamlit, z.B. für nächtliche Reports.
+
+    python -m ares AAPL NVDA OMV.VI --format json --out reports/
+    python -m ares --file watchlist.txt --format parquet --workers 8
+    python -m ares --file watchlist.txt --bundle parquet      # zusätzlich alle Rohdaten als ZIP
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+from ares.core import load_ticker_data, run_ticker
+from ares.earnings import EarningsIndex
+from ares.export import FORMATS, export_frames, write_zip
+from ares.fx import FxError, fx_history
+from ares.kpis import stack_kpis
+from ares.screener import parse_tickers
+from ares.store import PriceStore
+
+
+def _analyze_one(ticker, acc_eur, risk_p, overnight):
+    """Läuft im Worker-Prozess; Fehler werden pro Ticker zurückgemeldet statt den Lauf abzubrechen."""
+    try:
+        return ticker, run_ticker(ticker, PriceStore(), acc_eur, risk_p, overnight, EarningsIndex()).to_dict(), None
+    except Exception as e:
+        return ticker, None, f"{type(e).__name__}: {e}"
+
+
+def run_batch(tickers, acc_eur=10000, risk_p=1.0, overnight=True, workers=None):
+    """-> (results, errors): Ticker -> Ergebnis-Dict bzw. Fehlermeldung."""
+    results, errors = {}, {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_analyze_one, t, acc_eur, risk_p, overnight) for t in tickers]
+        for fut in futures:
+            ticker, result, error = fut.result()
+            if error:
+                errors[ticker] = error
+            else:
+                results[ticker] = result
+    return results, errors
+
+
+def flatten(results):
+    """Eine Zeile je Ticker (ohne Trend-Reihen) für tabellarische Formate."""
+    rows = []
+    for r in results.values():
+        row = {k: v for k, v in r.items() if k not in ("trends", "kpi_matrix")}
+        rows.append(row)
+    df = pd.json_normalize(rows, sep=".")
+    if "safety.reasons" in df.columns:
+        df["safety.reasons"] = df["safety.reasons"].map(" | ".join)
+    return df
+
+
+def write_results(results, errors, out_dir, fmt):
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stem = out_dir / f"ares_{date.today().isoformat()}"
+    if fmt == "json":
+        path = stem.with_suffix(".json")
+        path.write_text(json.dumps({"results": results, "errors": errors}, ensure_ascii=False, indent=2))
+    else:
+        path = stem.with_suffix(".parquet")
+        flatten(results).to_parquet(path, index=False)
+        # KPI-Matrizen aller Ticker gestapelt (Ticker, KPI) × Stichtag – für Screening über Perioden
+        kpis = stack_kpis({t: pd.DataFrame.from_dict(r["kpi_matrix"], orient="index") for t, r in results.items()})
+        if not kpis.empty:
+            kpis.to_parquet(stem.with_name(stem.name + "_kpis.parquet"))
+        if errors:
+            stem.with_name(stem.name + "_errors.json").write_text(json.dumps(errors, ensure_ascii=False, indent=2))
+    return path
+
+
+def write_bundle(results, out_dir, fmt):
+    """Rohdaten aller erfolgreichen Ticker als ein ZIP; wird Ticker für Ticker in die Datei gestreamt."""
+    currencies = sorted({r["currency"] for r in results.values()} - {"EUR"})
+
+    def entries():
+        if currencies:
+            try:
+                yield "", {"FX": fx_history(currencies)}
+            except FxError as e:
+                print(f"  FX nicht im Export: {e}", file=sys.stderr)
+        store, earnings = PriceStore(), EarningsIndex()
+        for ticker in results:
+            yield ticker, export_frames(load_ticker_data(ticker, store, earnings=earnings), hist=store.read(ticker))
+
+    path = Path(out_dir) / f"ares_{date.today().isoformat()}_daten.zip"
+    write_zip(path, entries(), fmt)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m ares", description="ARES-Analyse für eine Ticker-Liste ohne Browser.")
+    parser.add_argument("tickers", nargs="*", help="Tickersymbole")
+    parser.add_argument("--file", help="Datei mit Tickersymbolen (Komma/Leerzeichen/Zeilen getrennt)")
+    parser.add_argument("--account", type=float, default=10000, help="Kontogröße in EUR (Standard: 10000)")
+    parser.add_argument("--risk", type=float, default=1.0, help="Risiko pro Trade in %% (Standard: 1.0)")
+    parser.add_argument("--intraday", action="store_true", help="Haltedauer nur Intraday (Standard: Overnight)")
+    parser.add_argument("--format", choices=["json", "parquet"], default="json")
+    parser.add_argument("--out", default="reports", help="Zielverzeichnis (Standard: reports/)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Anzahl Prozesse")
+    parser.add_argument("--bundle", choices=FORMATS, help="Rohdaten (Abschlüsse, Kurse, FX) zusätzlich als ZIP")
+    args = parser.parse_args(argv)
+
+    text = " ".join(args.tickers)
+    if args.file:
+        text += " " + Path(args.file).read_text()
+    tickers = parse_tickers(text)
+    if not tickers:
+        parser.error("keine Ticker angegeben")
+
+    t0 = time.perf_counter()
+    # Termine einmal gebündelt vorab – die Worker lesen danach nur noch den lokalen Index
+    EarningsIndex().refresh(tickers=tickers)
+    results, errors = run_batch(tickers, args.account, args.risk, not args.intraday, args.workers)
+    path = write_results(results, errors, args.out, args.format)
+    if args.bundle and results:
+        print(f"Rohdaten -> {write_bundle(results, args.out, args.bundle)}", file=sys.stderr)
+    print(f"{len(results)}/{len(tickers)} Ticker in {time.perf_counter() - t0:.1f}s -> {path}", file=sys.stderr)
+    for ticker, error in errors.items():
+        print(f"  {ticker}: {error}", file=sys.stderr)
+    return 0 if results else 1
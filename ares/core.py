@@ -0,0 +1,270 @@
+"""Analyse-Kern ohne Streamlit: Daten laden, Ampel, Positionsrechner, KPIs.
+
+Die Streamlit-Seite und der CLI-Batch (`python -m ares`) nutzen dieselben Funktionen;
+`analyze` ist rein (keine I/O) und liefert ein strukturiertes `AnalysisResult`.
+"""
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass, field
+from datetime import date
+from math import floor
+
+import numpy as np
+import pandas as pd
+
+from ares.fetch import fetch_parts
+from ares.fx import FxError, fx_history, latest_rates
+from ares.indicators import atr_last
+from ares.kpis import kpi_matrix, latest_kpis
+from ares.metrics import METRICS
+from ares.providers import get_provider
+
+# --- REGELN (Ampel & Positionsrechner) ---
+VOL_MIN = 500000
+STOP_ATR_MULT = 1.5
+# Earnings-Sperrfrist in Tagen: Overnight-Positionen tragen das Gap-Risiko länger
+EARNINGS_DAYS = {True: 7, False: 3}
+
+# Aus `info` (oft > 150 Felder) werden nur diese behalten – reicht für Anzeige, KGV/KBV und Währung
+INFO_KEYS = ("shortName", "longName", "currency", "exchange", "quoteType", "trailingPE", "priceToBook")
+# Spalten der Historie im Cache; Dividenden/Splits braucht nur der Preis-Speicher (store.py)
+PRICE_COLUMNS = ("Open", "High", "Low", "Close")
+
+TREND_ITEMS = {
+    "Umsatz": ("inc", "Total Revenue"),
+    "Reingewinn": ("inc", "Net Income"),
+    "EBITDA": ("inc", "EBITDA"),
+    "Eigenkapital": ("bal", "Stockholders Equity"),
+    "Operativer Cashflow": ("cf", "Operating Cash Flow"),
+}
+
+
+@dataclass(frozen=True)
+class TickerData:
+    """Alles, was pro Ticker von Yahoo geladen wird (wird zwischen Sessions geteilt -> nicht verändern)."""
+    hist: pd.DataFrame
+    info: dict
+    inc: pd.DataFrame
+    bal: pd.DataFrame
+    cf: pd.DataFrame
+    earn_date: object = None
+    timings: dict = field(default_factory=dict)
+    errors: dict = field(default_factory=dict)
+
+    @property
+    def incomplete(self):
+        """Leere Historie oder nicht geladene Teile -> im Cache nicht als frisch behandeln."""
+        return self.hist.empty or bool(self.errors)
+
+
+@dataclass
+class Safety:
+    status: str
+    reasons: list
+    vol_20d: float
+    days_to_earn: object
+
+
+@dataclass
+class Position:
+    risk_eur: float
+    ex_rate: object
+    atr: float
+    stop_pct: float
+    stop_price: float
+    shares: object
+    fx_error: object = None
+
+
+@dataclass
+class AnalysisResult:
+    ticker: str
+    name: str
+    currency: str
+    price: float
+    prev_close: float
+    change_pct: float
+    safety: Safety
+    position: Position
+    kpis: dict
+    kpi_matrix: pd.DataFrame = field(repr=False)
+    trends: dict = field(repr=False)
+
+    def to_dict(self):
+        """JSON-taugliche Darstellung (Trends als {Jahr: Wert}, KPI-Matrix als {KPI: {Stichtag: Wert}})."""
+        out = asdict(self)
+        out["trends"] = {k: {str(i.year): _num(v) for i, v in s.items()} for k, s in self.trends.items()}
+        out["kpi_matrix"] = {k: {str(d.date()): _num(v) for d, v in row.items()} for k, row in self.kpi_matrix.iterrows()}
+        return _jsonable(out)
+
+
+def _num(v):
+    return None if v is None or pd.isna(v) else float(v)
+
+
+def _jsonable(obj):
+    if isinstance(obj, dict):
+        return {k: _jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_jsonable(v) for v in obj]
+    if isinstance(obj, (np.integer, np.floating)):
+        return _num(obj)
+    if isinstance(obj, float):
+        return _num(obj)
+    return obj
+
+
+# --- LADEN ---
+def compact_history(hist):
+    """Kompakte Historie für den Cache: Preise als float32, Volumen als int64, ohne ungenutzte Spalten.
+
+    float32 reicht für ~7 signifikante Stellen; Indikatoren rechnen intern ohnehin in float64.
+    """
+    if hist.empty:
+        return hist
+    out = hist[[c for c in PRICE_COLUMNS if c in hist.columns]].astype("float32")
+    if "Volume" in hist.columns:
+        out["Volume"] = hist["Volume"].fillna(0).astype("int64")
+    return out
+
+
+def slim_info(info):
+    return {k: info[k] for k in INFO_KEYS if info.get(k) is not None}
+
+
+def load_ticker_data(ticker, store, provider=None, earnings=None):
+    """Lädt alle Bausteine eines Tickers parallel; die Historie inkrementell über `store`.
+
+    Mit `earnings` (EarningsIndex) kommt der Termin aus dem lokalen Index; nur Ticker, die dort
+    heute noch nicht geprüft wurden, fragen `calendar` einzeln ab und werden nachgetragen.
+    """
+    src = provider or get_provider()
+    jobs = {
+        # Historie liegt lokal; nachgeladen werden nur die Bars seit dem letzten gespeicherten Zeitpunkt
+        "history": lambda: store.update(ticker, lambda start: src.history(ticker, start=start)),
+        "info": lambda: src.info(ticker),
+        "financials": lambda: src.financials(ticker),
+        "balance_sheet": lambda: src.balance_sheet(ticker),
+        "cashflow": lambda: src.cashflow(ticker),
+    }
+    indexed = earnings is not None and earnings.covers(ticker)
+    if not indexed:
+        jobs["calendar"] = lambda: src.calendar(ticker)
+    # Die Abfragen sind unabhängig -> parallel; ein fehlender Baustein (z.B. calendar) blockiert den Rest nicht
+    parts, timings, errors = fetch_parts(
+        jobs,
+        defaults={
+            "history": pd.DataFrame(), "info": {}, "financials": pd.DataFrame(),
+            "balance_sheet": pd.DataFrame(), "cashflow": pd.DataFrame(), "calendar": None,
+        },
+    )
+    # Nur echte Ladevorgänge landen hier -> Anteil von Yahoo an langsamen Seitenaufrufen
+    for part, sec in timings.items():
+        METRICS.observe(f"upstream.{part}", sec)
+    if indexed:
+        earn_date = earnings.next_date(ticker)
+        METRICS.event("earnings", "indexed")
+    else:
+        earn_date = parts["calendar"]
+        if earnings is not None and "calendar" not in errors:
+            earnings.add(ticker, earn_date)
+            METRICS.event("earnings", "lookup")
+    return TickerData(compact_history(parts["history"]), slim_info(parts["info"] or {}), parts["financials"], parts["balance_sheet"],
+                      parts["cashflow"], earn_date, timings, errors)
+
+
+def exchange_rate(currency, to_curr="EUR"):
+    """Ungecachter Einzelkurs (CLI); die App nutzt den gecachten Weg über fx_history."""
+    if currency == to_curr:
+        return 1.0
+    return latest_rates(fx_history([currency], to_curr))[currency]
+
+
+# --- BERECHNUNG ---
+def assess_safety(hist, earn_date, overnight, today=None):
+    """Trade-Safety-Ampel: Earnings-Nähe und Liquidität."""
+    today = today or date.today()
+    vol_20d = hist['Volume'].tail(20).mean()
+    days_to_earn = (earn_date.date() - today).days if earn_date else None
+
+    status = "GRÜN"
+    reasons = []
+    if days_to_earn is not None and days_to_earn <= EARNINGS_DAYS[overnight]:
+        status = "ROT"; reasons.append(f"⚠️ **Earnings:** In {days_to_earn} Tagen. Vorsicht vor Gaps!")
+    if vol_20d < VOL_MIN:
+        status = "ROT"; reasons.append("⚠️ **Liquidität:** Geringes Volumen (< 500k).")
+    return Safety(status, reasons, float(vol_20d), days_to_earn)
+
+
+def size_position(hist, acc_eur, risk_p, ex_rate, fx_error=None):
+    """ATR-Stop (1,5 × ATR14) und Stückzahl aus dem EUR-Risikobudget; ohne Wechselkurs keine Stückzahl."""
+    curr_p = hist['Close'].iloc[-1]
+    risk_eur = acc_eur * (risk_p / 100)
+    atr_val = atr_last(hist["High"].to_numpy(), hist["Low"].to_numpy(), hist["Close"].to_numpy())
+    stop_pct = (atr_val / curr_p) * STOP_ATR_MULT * 100
+    shares = floor((risk_eur / ex_rate) / (curr_p * stop_pct / 100)) if ex_rate else None
+    return Position(risk_eur, ex_rate, float(atr_val), float(stop_pct), float(curr_p * (1 - stop_pct / 100)),
+                    shares, fx_error)
+
+
+def trend_series(data):
+    """Zeitreihen für den Trend-Chart, chronologisch (älteste Periode links)."""
+    frames = {"inc": data.inc, "bal": data.bal, "cf": data.cf}
+    out = {}
+    for label, (frame, item) in TREND_ITEMS.items():
+        df = frames[frame]
+        out[label] = df.loc[item][::-1] if item in df.index else pd.Series(dtype=float)
+    return out
+
+
+def fundamentals(data):
+    """KPI-Matrix, aktuelle KPIs und Trendreihen – hängen nur von den Daten ab, nicht vom Risiko-Setup."""
+    matrix = kpi_matrix(data.inc, data.bal, data.hist)
+    return matrix, latest_kpis(matrix, data.info), trend_series(data)
+
+
+def analyze(ticker, data, acc_eur, risk_p, overnight, ex_rate, fx_error=None, today=None, timer=None, funds=None):
+    """Komplette Auswertung eines Tickers ohne Netzwerk/Streamlit.
+
+    `timer(name)` ist optional ein Kontextmanager je Stufe (z.B. `METRICS.stage`) für Ampel, Sizer und KPIs.
+    `funds` übernimmt ein bereits berechnetes `fundamentals(data)` (z.B. aus einem Cache) – die Stufe
+    "kpis" misst dann der Aufrufer dort, wo sie tatsächlich berechnet wird.
+    """
+    timer = timer or (lambda name: nullcontext())
+    hist, info = data.hist, data.info
+    if hist.empty:
+        raise ValueError(f"Keine Kursdaten für {ticker}")
+    if funds is None:
+        with timer("kpis"):
+            funds = fundamentals(data)
+    matrix, kpis, trends = funds
+    with timer("ampel"):
+        safety = assess_safety(hist, data.earn_date, overnight, today)
+    with timer("position"):
+        position = size_position(hist, acc_eur, risk_p, ex_rate, fx_error)
+    curr_p = float(hist['Close'].iloc[-1])
+    prev_p = float(hist['Close'].iloc[-2]) if len(hist) > 1 else curr_p
+    return AnalysisResult(
+        ticker=ticker,
+        name=info.get('shortName', ticker),
+        currency=info.get('currency', 'USD'),
+        price=curr_p,
+        prev_close=prev_p,
+        change_pct=((curr_p - prev_p) / prev_p) * 100,
+        safety=safety,
+        position=position,
+        kpis=kpis,
+        kpi_matrix=matrix,
+        trends=trends,
+    )
+
+
+def run_ticker(ticker, store, acc_eur, risk_p, overnight, earnings=None):
+    """Laden + Wechselkurs + Analyse für einen Ticker (CLI/Batch)."""
+    data = load_ticker_data(ticker, store, earnings=earnings)
+    currency = data.info.get('currency', 'USD')
+    try:
+        ex_rate, fx_error = exchange_rate(currency), None
+    except FxError as e:
+        ex_rate, fx_error = None, str(e)
+    return analyze(ticker, data, acc_eur, risk_p, overnight, ex_rate, fx_error)
+
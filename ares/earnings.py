@@ -0,0 +1,220 @@
+"""Lokaler Earnings-Index: Termine des ganzen beobachteten Universums, einmal täglich aufgefrischt.
+
+Quelle ist der gebündelte Earnings-Kalender von Yahoo (seitenweise, ein Aufruf je 100 Termine).
+Ticker, die dort fehlen (z.B. Börsen außerhalb der USA), werden einzeln über `calendar` nachgetragen.
+Der nächste Termin eines Tickers ist ein Dict-Zugriff, Bereichsabfragen („alle Earnings in den
+nächsten 7 Tagen“) sind eine Binärsuche im sortierten Datums-Array – beides ohne Netzwerk.
+
+    python -m ares.earnings --refresh --file watchlist.txt
+    python -m ares.earnings --days 7
+"""
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ares.metrics import METRICS
+from ares.store import DATA_DIR
+
+log = logging.getLogger(__name__)
+
+MAX_AGE = 86400  # Sekunden; danach gilt der Index bzw. ein einzeln nachgeschlagener Ticker als veraltet
+HORIZON_DAYS = 90  # so weit reicht der gebündelte Abruf in die Zukunft
+PAST_DAYS = 7  # und so weit zurück (frisch gemeldete Termine ersetzen die Schätzung)
+
+_EMPTY = pd.DataFrame({"ticker": pd.Series(dtype=str), "date": pd.Series(dtype="datetime64[s]")})
+
+
+def _day(value):
+    return np.datetime64(pd.Timestamp(value).date(), "D")
+
+
+def _today(today=None):
+    return _day(today or date.today())
+
+
+class EarningsIndex:
+    """Ticker -> Earnings-Termine, persistent als Parquet unter ARES_DATA_DIR.
+
+    Zeilen ohne Datum merken sich, dass ein Ticker geprüft wurde und keinen Termin hat – so geht
+    auch dafür höchstens einmal am Tag eine Anfrage raus. Vergangene Termine bleiben erhalten
+    (Sperrfristen im Backtest).
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else DATA_DIR / "earnings.parquet"
+        self.refreshed_at = None
+        self._lock = threading.Lock()
+        self._rows = _EMPTY.assign(checked=pd.Series(dtype=float))
+        self._build()
+        self.load()
+
+    # --- Abfragen (lesen nur die zuletzt gebaute Sicht, daher ohne Lock) ---
+    def stale(self, now=None):
+        return self.refreshed_at is None or (now or time.time()) - self.refreshed_at > MAX_AGE
+
+    def covers(self, ticker, now=None):
+        """True, wenn der Ticker in den letzten MAX_AGE Sekunden geprüft wurde."""
+        checked = self._checked.get(ticker)
+        return checked is not None and (now or time.time()) - checked <= MAX_AGE
+
+    def next_date(self, ticker, today=None):
+        """Nächster Termin ab heute oder None."""
+        events = self._by_ticker.get(ticker)
+        if events is None:
+            return None
+        pos = np.searchsorted(events, _today(today))
+        return pd.Timestamp(events[pos]) if pos < len(events) else None
+
+    def dates(self, ticker):
+        """Alle bekannten Termine eines Tickers (auch vergangene)."""
+        return [pd.Timestamp(d) for d in self._by_ticker.get(ticker, ())]
+
+    def between(self, start, end, tickers=None):
+        """Termine von `start` bis einschließlich `end` -> DataFrame (Ticker, Datum), nach Datum sortiert."""
+        lo = np.searchsorted(self._dates, _day(start), side="left")
+        hi = np.searchsorted(self._dates, _day(end), side="right")
+        out = pd.DataFrame({"Ticker": self._tickers[lo:hi], "Datum": pd.to_datetime(self._dates[lo:hi])})
+        if tickers is not None:
+            out = out[out["Ticker"].isin(list(tickers))]
+        return out.reset_index(drop=True)
+
+    def upcoming(self, days=7, today=None, tickers=None):
+        start = _today(today)
+        return self.between(start, start + np.timedelta64(days, "D"), tickers)
+
+    def __len__(self):
+        return len(self._checked)
+
+    # --- Änderungen ---
+    def _build(self):
+        rows = self._rows
+        events = rows.dropna(subset=["date"]).drop_duplicates(["ticker", "date"]).sort_values("date", kind="stable")
+        dates = events["date"].to_numpy().astype("datetime64[D]")
+        tickers = events["ticker"].to_numpy(dtype=object)
+        by_ticker = {t: dates[idx] for t, idx in events.reset_index(drop=True).groupby("ticker").indices.items()}
+        checked = rows.groupby("ticker")["checked"].max().to_dict()
+        # Eine Zuweisung je Attribut – Leser sehen entweder die alte oder die neue Sicht
+        self._dates, self._tickers, self._by_ticker, self._checked = dates, tickers, by_ticker, checked
+
+    def _replace(self, tickers, fresh, start, now):
+        """Ersetzt für `tickers` alle Termine ab `start` durch `fresh` (Spalten ticker, date)."""
+        rows = self._rows
+        tickers = set(tickers)
+        keep = ~(rows["ticker"].isin(tickers) & ((rows["date"] >= start) | rows["date"].isna()))
+        fresh = fresh.assign(checked=now)
+        seen = set(fresh["ticker"])
+        marks = pd.DataFrame({"ticker": sorted(tickers - seen), "date": pd.NaT, "checked": now})
+        frames = [df for df in (rows[keep], fresh, marks) if not df.empty]
+        rows = pd.concat(frames, ignore_index=True) if frames else rows[keep]
+        self._rows = rows.assign(date=rows["date"].astype("datetime64[s]"))
+
+    def add(self, ticker, earn_date, today=None):
+        """Ergebnis eines einzelnen `calendar`-Abrufs übernehmen (None = kein Termin bekannt)."""
+        fresh = _EMPTY if earn_date is None else \
+            pd.DataFrame({"ticker": [ticker], "date": [pd.Timestamp(earn_date).normalize()]})
+        with self._lock:
+            self._replace([ticker], fresh, pd.Timestamp(_today(today)), time.time())
+            self._build()
+            self.save()
+
+    def refresh(self, provider=None, tickers=(), days=HORIZON_DAYS, today=None, force=False):
+        """Gebündelter Abruf der nächsten `days` Tage (höchstens alle MAX_AGE Sekunden, mit `force` sofort)
+        plus Einzelabruf für `tickers`, die weder darin vorkommen noch kürzlich geprüft wurden.
+        Rückgabe: {"events", "single", "errors"}."""
+        from ares.fetch import fetch_parts
+        from ares.providers import get_provider
+
+        src = provider or get_provider()
+        t0, now = time.perf_counter(), time.time()
+        today = pd.Timestamp(_today(today))
+        start, end = today - pd.Timedelta(days=PAST_DAYS), today + pd.Timedelta(days=days)
+        errors = {}
+        due = force or self.stale(now)
+        bulk = _EMPTY
+        if due:
+            try:
+                bulk = src.earnings_calendar(start, end)
+            except Exception as e:
+                # Ohne Sammelabruf bleibt der Einzelweg – langsamer, aber vollständig
+                errors["Kalender"] = f"{type(e).__name__}: {e}"
+        in_bulk = set(bulk["ticker"])
+        missing = [t for t in tickers if t not in in_bulk and not self.covers(t, now)]
+        if not due and not missing:
+            return {"events": 0, "single": 0, "errors": {}}
+
+        parts, _, part_errors = fetch_parts({t: (lambda t=t: src.calendar(t)) for t in missing}, defaults={})
+        errors.update(part_errors)
+        checked = [t for t in missing if t not in part_errors]
+        found = [t for t in checked if parts[t] is not None]
+        single = pd.DataFrame({"ticker": found, "date": [pd.Timestamp(parts[t]).normalize() for t in found]})
+
+        with self._lock:
+            if not bulk.empty:
+                self._replace(in_bulk, bulk[["ticker", "date"]], start, now)
+            if checked:
+                self._replace(checked, single, today, now)
+            if due and "Kalender" not in errors:
+                self.refreshed_at = now
+            self._build()
+            self.save()
+        METRICS.observe("earnings.refresh", time.perf_counter() - t0)
+        for name, error in errors.items():
+            log.warning("Earnings-Termin für %s nicht geladen: %s", name, error)
+        return {"events": len(bulk), "single": len(missing), "errors": errors}
+
+    # --- Persistenz ---
+    def load(self):
+        if not self.path.exists():
+            return self
+        try:
+            rows = pd.read_parquet(self.path)
+        except Exception:
+            # Defekte Datei -> leerer Index, wird beim nächsten Refresh neu geschrieben
+            return self
+        with self._lock:
+            self.refreshed_at = rows.attrs.get("refreshed_at")
+            self._rows = rows.assign(date=rows["date"].astype("datetime64[s]"))
+            self._build()
+        return self
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        rows = self._rows.copy()
+        rows.attrs["refreshed_at"] = self.refreshed_at
+        # Temp-Name je Prozess: Batch-Worker tragen parallel einzelne Ticker nach
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        rows.to_parquet(tmp, index=False)
+        os.replace(tmp, self.path)
+
+
+def main(argv=None):
+    from ares.screener import parse_tickers
+
+    parser = argparse.ArgumentParser(prog="python -m ares.earnings", description="Lokaler Earnings-Index.")
+    parser.add_argument("tickers", nargs="*", help="Zusätzlich einzeln zu prüfende Ticker")
+    parser.add_argument("--file", help="Datei mit Tickersymbolen (z.B. die Watchlist)")
+    parser.add_argument("--refresh", action="store_true", help="Index jetzt neu laden (sonst höchstens einmal am Tag)")
+    parser.add_argument("--days", type=int, default=7, help="Termine der nächsten N Tage ausgeben")
+    args = parser.parse_args(argv)
+
+    text = " ".join(args.tickers) + (" " + Path(args.file).read_text() if args.file else "")
+    tickers = parse_tickers(text)
+    index = EarningsIndex()
+    stats = index.refresh(tickers=tickers, force=args.refresh)
+    for name, error in stats["errors"].items():
+        print(f"  {name}: {error}", file=sys.stderr)
+    upcoming = index.upcoming(args.days, tickers=tickers or None)
+    print(upcoming.to_string(index=False) if not upcoming.empty else f"Keine Earnings in den nächsten {args.days} Tagen.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
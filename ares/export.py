@@ -0,0 +1,95 @@
+"""Daten-Export als ZIP (CSV oder Parquet): Abschlüsse, komplette Kurshistorie und FX-Reihen.
+
+Das ZIP entsteht als Folge von Byte-Blöcken (`iter_zip`) – ein Ticker nach dem anderen, ohne das
+ganze Archiv vorher in einem BytesIO aufzubauen. `write_zip` streamt diese Blöcke in eine Datei.
+"""
+import io
+import os
+import zipfile
+from pathlib import Path
+
+FORMATS = ("csv", "parquet")
+CHUNK_SIZE = 1 << 20  # 1 MiB je ausgegebenem Block
+
+
+def export_frames(data, fx=None, hist=None):
+    """Dateiname (ohne Endung) -> DataFrame für einen Ticker; `fx` = tägliche Kurse Währung -> EUR.
+
+    `hist`: volle Historie aus dem PriceStore (float64, mit Dividenden/Splits). `data.hist` ist nur die
+    kompakte Cache-Fassung und dient als Ersatz, wenn der Speicher (noch) nichts hat.
+    """
+    if hist is None or hist.empty:
+        hist = data.hist
+    frames = {"GuV": data.inc, "Bilanz": data.bal, "Cashflow": data.cf, "Kurse": hist}
+    if fx is not None and not fx.empty:
+        frames["FX"] = fx
+    return frames
+
+
+def _serialize(frame, fmt):
+    if fmt == "csv":
+        return frame.to_csv().encode("utf-8")
+    # Parquet braucht Text-Spaltennamen (Abschlüsse haben Stichtage als Spalten)
+    frame = frame.set_axis([str(c) for c in frame.columns], axis=1)
+    buf = io.BytesIO()
+    frame.to_parquet(buf)
+    return buf.getvalue()
+
+
+class _Sink:
+    """Nimmt, was zipfile schreibt, und gibt es blockweise wieder ab (kein tell/seek -> Streaming-Modus)."""
+
+    def __init__(self):
+        self._parts = []
+
+    def write(self, b):
+        self._parts.append(bytes(b))
+        return len(b)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        out = b"".join(self._parts)
+        self._parts.clear()
+        return out
+
+
+def iter_zip(entries, fmt="csv", chunk_size=CHUNK_SIZE):
+    """Erzeugt das ZIP blockweise. `entries`: Iterable aus (Ordner, {Name: DataFrame}), gern ein Generator –
+    dann liegt immer nur ein Ticker im Speicher."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unbekanntes Format: {fmt}")
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for folder, frames in entries:
+            for name, frame in frames.items():
+                arcname = f"{folder}/{name}.{fmt}" if folder else f"{name}.{fmt}"
+                payload = _serialize(frame, fmt)
+                with zf.open(arcname, "w") as member:
+                    for i in range(0, len(payload), chunk_size):
+                        member.write(payload[i:i + chunk_size])
+                        chunk = sink.drain()
+                        if chunk:
+                            yield chunk
+    tail = sink.drain()
+    if tail:
+        yield tail
+
+
+def export_zip(data, fmt="csv", fx=None, hist=None):
+    """Export eines Tickers als Bytes (für den Download-Button)."""
+    return b"".join(iter_zip([("", export_frames(data, fx, hist))], fmt))
+
+
+def write_zip(path, entries, fmt="csv"):
+    """Streamt das ZIP in eine Datei (atomar über eine Temp-Datei). Rückgabe: geschriebene Bytes."""
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    size = 0
+    with open(tmp, "wb") as f:
+        for chunk in iter_zip(entries, fmt):
+            f.write(chunk)
+            size += len(chunk)
+    os.replace(tmp, path)
+    return size
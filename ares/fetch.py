@@ -0,0 +1,73 @@
+"""Parallele Abfrage der voneinander unabhängigen Yahoo-Bausteine eines Tickers."""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ares.net import is_background, mark_background
+from ares.providers import get_provider
+
+
+# Gemeinsamer, begrenzter Pool für alle Sessions des Server-Prozesses
+MAX_WORKERS = 12
+PART_TIMEOUT = 20  # Sekunden je Baustein, ab dessen Start gemessen
+QUEUE_TIMEOUT = 60  # Sekunden, die ein Baustein höchstens auf einen freien Thread wartet
+BACKGROUND_WORKERS = 4  # eigener Pool fürs Vorwärmen – blockiert keine interaktiven Abrufe
+_POLL = 0.05
+
+_pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="ares-fetch")
+_background_pool = ThreadPoolExecutor(max_workers=BACKGROUND_WORKERS, thread_name_prefix="ares-fetch-bg",
+                                      initializer=mark_background)
+
+
+def _timed(fn, started, name):
+    started[name] = t0 = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - t0
+
+
+def _wait(fut, begun, submitted, timeout):
+    """Ergebnis von `fut`; die Frist `timeout` beginnt erst, wenn der Baustein läuft (`begun()`)."""
+    while True:
+        start = begun()
+        if start is not None:
+            try:
+                return fut.result(timeout=max(0.0, start + timeout - time.perf_counter()))
+            except TimeoutError:
+                raise TimeoutError(f"Timeout nach {timeout}s") from None
+        if time.perf_counter() - submitted > QUEUE_TIMEOUT and fut.cancel():
+            raise TimeoutError(f"Kein freier Thread nach {QUEUE_TIMEOUT}s")
+        try:
+            return fut.result(timeout=_POLL)
+        except TimeoutError:
+            pass
+
+
+def fetch_parts(jobs, defaults, timeout=PART_TIMEOUT):
+    """Führt die Callables in `jobs` (Name -> Funktion) parallel aus.
+
+    Schlägt ein Baustein fehl oder überschreitet `timeout`, wird `defaults[name]` verwendet und
+    der Fehler in `errors` vermerkt – die übrigen Bausteine laden trotzdem. Aufrufe aus
+    Hintergrund-Threads (Vorwärmen) laufen im eigenen, kleineren Pool.
+    Rückgabe: (results, timings, errors), Zeiten in Sekunden.
+    """
+    pool = _background_pool if is_background() else _pool
+    submitted = time.perf_counter()
+    started = {}
+    futures = {name: pool.submit(_timed, fn, started, name) for name, fn in jobs.items()}
+    results, timings, errors = {}, {}, {}
+    for name, fut in futures.items():
+        try:
+            results[name], timings[name] = _wait(fut, lambda name=name: started.get(name), submitted, timeout)
+        except TimeoutError as e:
+            # Der Thread läuft im Hintergrund zu Ende, sein Ergebnis wird verworfen
+            fut.cancel()
+            results[name], timings[name] = defaults.get(name), timeout
+            errors[name] = str(e)
+        except Exception as e:
+            results[name], timings[name] = defaults.get(name), time.perf_counter() - submitted
+            errors[name] = f"{type(e).__name__}: {e}"
+    return results, timings, errors
+
+
+def download_panel(tickers, period="6mo"):
+    """Ein gebündelter Download über die aktive Datenquelle -> DataFrame mit Spalten (Feld, Ticker)."""
+    return get_provider().download(list(tickers), period=period)
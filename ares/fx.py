@@ -0,0 +1,82 @@
+"""Wechselkurse: alle benötigten Paare in einem gebündelten Download, Kreuzkurse über USD."""
+import numpy as np
+import pandas as pd
+
+from ares.fetch import download_panel
+
+# Notierungen in Untereinheiten (z.B. London in Pence) -> (Hauptwährung, Faktor)
+MINOR_UNITS = {"GBp": ("GBP", 0.01), "GBX": ("GBP", 0.01), "ILA": ("ILS", 0.01), "ZAc": ("ZAR", 0.01)}
+
+
+class FxError(Exception):
+    """Wechselkurs nicht ermittelbar – wird gemeldet statt still mit 1.0 weiterzurechnen."""
+
+
+def _normalize(currency):
+    if not currency or currency == "N/A":
+        raise FxError(f"Unbekannte Währung: {currency!r}")
+    return MINOR_UNITS.get(currency, (currency.upper(), 1.0))
+
+
+def fx_symbols(currencies, to_curr="EUR"):
+    """Direkte Paare plus USD-Beine für Kreuzkurse – alles in einem Request ladbar."""
+    bases = sorted({_normalize(c)[0] for c in currencies} - {to_curr})
+    symbols = {f"{b}{to_curr}=X" for b in bases}
+    if to_curr != "USD":
+        symbols |= {f"{b}USD=X" for b in bases if b != "USD"} | {f"USD{to_curr}=X"}
+    return sorted(symbols)
+
+
+def fx_history(currencies, to_curr="EUR", period="1y"):
+    """Tägliche Kurse Währung -> `to_curr` als DataFrame (Datum × Währung), fehlende Tage vorwärts gefüllt.
+
+    Fehlt ein direktes Paar, wird über USD trianguliert: X→EUR = X→USD × USD→EUR.
+    Spalten, die weder direkt noch über USD ermittelbar sind, enthalten NaN.
+    """
+    currencies = sorted(set(currencies))
+    symbols = fx_symbols(currencies, to_curr)
+    if symbols:
+        try:
+            panel = download_panel(symbols, period=period)
+        except Exception as e:
+            raise FxError(f"Download der Wechselkurse fehlgeschlagen: {e}") from e
+        if panel.empty or "Close" not in panel.columns.get_level_values(0):
+            raise FxError(f"Keine Kursdaten für {', '.join(symbols)}")
+        close = panel["Close"].sort_index().ffill()
+        index = close.index
+    else:
+        close, index = pd.DataFrame(), pd.DatetimeIndex([pd.Timestamp.now().normalize()])
+
+    def leg(symbol):
+        return close[symbol] if symbol in close.columns else pd.Series(np.nan, index=index)
+
+    out = {}
+    for cur in currencies:
+        base, factor = _normalize(cur)
+        if base == to_curr:
+            rate = pd.Series(1.0, index=index)
+        else:
+            rate = leg(f"{base}{to_curr}=X")
+            if to_curr != "USD" and base != "USD":
+                rate = rate.fillna(leg(f"{base}USD=X") * leg(f"USD{to_curr}=X"))
+        out[cur] = rate * factor
+    return pd.DataFrame(out, index=index)
+
+
+def latest_rates(history, strict=True):
+    """Letzter verfügbarer Kurs je Währung. `strict`: FxError statt NaN bei fehlenden Kursen."""
+    last = history.ffill().iloc[-1] if not history.empty else pd.Series(np.nan, index=history.columns)
+    missing = [cur for cur, v in last.items() if not np.isfinite(v) or v <= 0]
+    if strict and missing:
+        raise FxError(f"Kein Wechselkurs für {', '.join(missing)}")
+    return last.to_dict()
+
+
+def convert(frame, currencies, history):
+    """Rechnet Kursreihen (Datum × Ticker) vektorisiert mit dem Tageskurs der jeweiligen Währung um."""
+    def _naive(index):
+        return index.tz_localize(None) if getattr(index, "tz", None) is not None else index
+
+    hist = history.set_axis(_naive(history.index).normalize())
+    rates = hist[~hist.index.duplicated(keep="last")].reindex(_naive(frame.index).normalize(), method="ffill")
+    return frame * rates[[currencies[t] for t in frame.columns]].to_numpy()
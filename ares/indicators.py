@@ -0,0 +1,182 @@
+"""Indikatoren auf NumPy-Arrays (Zeit = Achse 0; 2-D = Bars × Ticker).
+
+Volle Neuberechnung über `true_range`/`atr`/`rolling_mean`/`volatility`, für neu eintreffende Bars
+die O(1)-Zustände `RollingMean`, `ATRState` und `VolatilityState`.
+NaN-Semantik wie pandas `rolling(window).mean()`: ein NaN im Fenster ergibt NaN.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+ATR_WINDOW = 14
+TRADING_DAYS = 252
+
+
+def _shift(x, n=1):
+    out = np.empty_like(x, dtype=float)
+    out[:n] = np.nan
+    out[n:] = x[:-n]
+    return out
+
+
+def true_range(high, low, close):
+    """max(|H-L|, |H-C_prev|, |L-C_prev|); für den ersten Bar nur |H-L| (wie pandas max(axis=1))."""
+    high, low, close = (np.asarray(a, dtype=float) for a in (high, low, close))
+    prev = _shift(close)
+    return np.fmax(np.abs(high - low), np.fmax(np.abs(high - prev), np.abs(low - prev)))
+
+
+def rolling_mean(x, window, min_periods=None):
+    """Gleitender Mittelwert über Achse 0 in O(n) (Kumulativsummen).
+
+    Ohne `min_periods` macht ein NaN im Fenster das Ergebnis NaN (wie pandas). Mit `min_periods`
+    zählen nur die vorhandenen Werte, solange es mindestens so viele sind.
+    """
+    x = np.asarray(x, dtype=float)
+    out = np.full_like(x, np.nan)
+    nan = np.isnan(x)
+    zero = np.zeros((1,) + x.shape[1:])
+    cs = np.concatenate([zero, np.cumsum(np.where(nan, 0.0, x), axis=0)])
+    cn = np.concatenate([zero, np.cumsum(~nan, axis=0)])
+    if min_periods is not None:
+        # Fensteranfang je Zeile; die ersten Zeilen haben ein kürzeres Fenster
+        start = np.maximum(np.arange(1, len(x) + 1) - window, 0)
+        valid = cn[1:] - cn[start]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(valid >= min_periods, (cs[1:] - cs[start]) / valid, np.nan)
+    if len(x) < window:
+        return out
+    sums = cs[window:] - cs[:-window]
+    complete = (cn[window:] - cn[:-window]) == window
+    out[window - 1:] = np.where(complete, sums / window, np.nan)
+    return out
+
+
+def rolling_last(x, window):
+    """Nur der letzte Wert von `rolling_mean` – betrachtet lediglich die letzten `window` Zeilen."""
+    x = np.asarray(x, dtype=float)
+    if len(x) < window:
+        return np.full(x.shape[1:], np.nan) if x.ndim > 1 else np.nan
+    return x[-window:].mean(axis=0)
+
+
+def atr(high, low, close, window=ATR_WINDOW):
+    """ATR als einfacher gleitender Durchschnitt der True Range (komplette Reihe)."""
+    return rolling_mean(true_range(high, low, close), window)
+
+
+def atr_last(high, low, close, window=ATR_WINDOW):
+    """Aktueller ATR-Wert; benötigt nur die letzten `window + 1` Bars."""
+    tail = slice(-(window + 1), None)
+    tr = true_range(np.asarray(high)[tail], np.asarray(low)[tail], np.asarray(close)[tail])
+    return rolling_last(tr[-window:], window)
+
+
+def returns(close, log=False):
+    """Tagesrenditen (erste Zeile NaN)."""
+    close = np.asarray(close, dtype=float)
+    prev = _shift(close)
+    return np.log(close / prev) if log else close / prev - 1
+
+
+def volatility(close, window=20, annualize=TRADING_DAYS):
+    """Gleitende Standardabweichung der Log-Renditen (ddof=1), annualisiert."""
+    r = returns(close, log=True)
+    out = np.full_like(r, np.nan)
+    if len(r) >= window:
+        out[window - 1:] = sliding_window_view(r, window, axis=0).std(axis=-1, ddof=1)
+    return out * np.sqrt(annualize)
+
+
+class RollingMean:
+    """Gleitender Mittelwert mit Ringpuffer: `update` kostet O(1) je Ticker."""
+
+    def __init__(self, window, width=None):
+        shape = (window,) if width is None else (window, width)
+        self.window = window
+        self._buf = np.full(shape, np.nan)
+        self._pos = 0
+        self._sum = np.zeros(shape[1:])
+        self._nans = np.full(shape[1:], window)
+
+    @classmethod
+    def from_history(cls, x, window):
+        x = np.asarray(x, dtype=float)
+        state = cls(window, x.shape[1] if x.ndim > 1 else None)
+        for row in x[-window:]:
+            state.update(row)
+        return state
+
+    def update(self, value):
+        value = np.asarray(value, dtype=float)
+        old = self._buf[self._pos]
+        self._nans = self._nans - np.isnan(old) + np.isnan(value)
+        self._sum = self._sum - np.nan_to_num(old) + np.nan_to_num(value)
+        self._buf[self._pos] = value
+        self._pos = (self._pos + 1) % self.window
+        return self.value
+
+    @property
+    def value(self):
+        return np.where(self._nans > 0, np.nan, self._sum / self.window)
+
+
+class ATRState:
+    """Laufender ATR: merkt sich den letzten Schlusskurs und die letzten `window` True Ranges."""
+
+    def __init__(self, window=ATR_WINDOW, width=None):
+        self._tr = RollingMean(window, width)
+        self._prev_close = np.nan if width is None else np.full(width, np.nan)
+
+    @classmethod
+    def from_history(cls, high, low, close, window=ATR_WINDOW):
+        close = np.asarray(close, dtype=float)
+        state = cls(window, close.shape[1] if close.ndim > 1 else None)
+        state._tr = RollingMean.from_history(true_range(high, low, close), window)
+        state._prev_close = close[-1]
+        return state
+
+    def update(self, high, low, close):
+        high, low, close = (np.asarray(a, dtype=float) for a in (high, low, close))
+        prev = self._prev_close
+        tr = np.fmax(np.abs(high - low), np.fmax(np.abs(high - prev), np.abs(low - prev)))
+        self._prev_close = close
+        return self._tr.update(tr)
+
+    @property
+    def value(self):
+        return self._tr.value
+
+
+class VolatilityState:
+    """Laufende annualisierte Volatilität der Log-Renditen über Summe und Quadratsumme."""
+
+    def __init__(self, window=20, width=None, annualize=TRADING_DAYS):
+        self.window = window
+        self.annualize = annualize
+        self._mean = RollingMean(window, width)
+        self._sq = RollingMean(window, width)
+        self._prev_close = np.nan if width is None else np.full(width, np.nan)
+
+    @classmethod
+    def from_history(cls, close, window=20, annualize=TRADING_DAYS):
+        close = np.asarray(close, dtype=float)
+        state = cls(window, close.shape[1] if close.ndim > 1 else None, annualize)
+        r = returns(close[-(window + 1):], log=True)
+        state._mean = RollingMean.from_history(r, window)
+        state._sq = RollingMean.from_history(r * r, window)
+        state._prev_close = close[-1]
+        return state
+
+    def update(self, close):
+        close = np.asarray(close, dtype=float)
+        r = np.log(close / self._prev_close)
+        self._prev_close = close
+        self._mean.update(r)
+        self._sq.update(r * r)
+        return self.value
+
+    @property
+    def value(self):
+        n = self.window
+        var = (self._sq.value - self._mean.value ** 2) * n / (n - 1)
+        return np.sqrt(np.maximum(var, 0.0) * self.annualize)
@@ -0,0 +1,105 @@
+"""Fundamental-KPIs als Matrix (KPI × Periode) statt Einzelwert-Lookups je Kennzahl.
+
+Die Positionen der Abschlüsse werden einmal über Alias-Listen auf feste Namen normalisiert;
+danach entstehen alle neun Kennzahlen für alle berichteten Perioden in einem Durchlauf.
+"""
+import numpy as np
+import pandas as pd
+
+# Normierte Position -> (Abschluss, Yahoo-Bezeichnungen in Prioritätsreihenfolge)
+ALIASES = {
+    "revenue": ("inc", ["Total Revenue", "Operating Revenue", "Revenue"]),
+    "net_income": ("inc", ["Net Income", "Net Income Common Stockholders",
+                           "Net Income From Continuing Operation Net Minority Interest"]),
+    "ebitda": ("inc", ["EBITDA", "Normalized EBITDA"]),
+    "eps": ("inc", ["Diluted EPS", "Basic EPS"]),
+    "equity": ("bal", ["Stockholders Equity", "Common Stock Equity", "Total Equity Gross Minority Interest"]),
+    "current_assets": ("bal", ["Current Assets", "Total Current Assets"]),
+    "current_liabilities": ("bal", ["Current Liabilities", "Total Current Liabilities"]),
+    "total_debt": ("bal", ["Total Debt"]),
+    "total_assets": ("bal", ["Total Assets"]),
+    "shares": ("bal", ["Ordinary Shares Number", "Share Issued"]),
+}
+
+KPIS = ["Gewinnmarge", "EBITDA-Marge", "EK-Rendite", "KGV", "Liquidität",
+        "Verschuldung", "Wachstum", "KBV", "Asset Turnover"]
+
+# Darstellung: Prozentwerte vs. Verhältniszahlen
+PERCENT_KPIS = {"Gewinnmarge", "EBITDA-Marge", "EK-Rendite", "Wachstum"}
+
+
+def line_items(inc, bal):
+    """Normierte Positionen × Perioden (neueste Periode links, wie bei yfinance).
+
+    Je Periode gilt die erste Alias-Bezeichnung mit Wert – fehlt "Total Revenue" in einem Jahr,
+    springt dort "Operating Revenue" ein.
+    """
+    frames = {"inc": inc, "bal": bal}
+    periods = pd.DatetimeIndex(sorted(set(inc.columns) | set(bal.columns), reverse=True))
+    rows = {}
+    for name, (frame, aliases) in ALIASES.items():
+        df = frames[frame]
+        present = [a for a in aliases if a in df.index]
+        if present:
+            rows[name] = df.loc[present].reindex(columns=periods).astype(float).bfill().iloc[0]
+        else:
+            rows[name] = pd.Series(np.nan, index=periods)
+    return pd.DataFrame(rows).T
+
+
+def _price_at(hist, periods):
+    """Schlusskurs zum (bzw. vor dem) jeweiligen Bilanzstichtag."""
+    if hist is None or hist.empty or len(periods) == 0:
+        return pd.Series(np.nan, index=periods)
+    close = hist["Close"]
+    index = close.index.tz_localize(None) if close.index.tz is not None else close.index
+    pos = index.searchsorted(periods, side="right") - 1
+    values = np.where(pos >= 0, close.to_numpy()[np.clip(pos, 0, None)], np.nan)
+    return pd.Series(values, index=periods)
+
+
+def kpi_matrix(inc, bal, hist=None):
+    """Alle neun KPIs für jede berichtete Periode (Zeilen = KPIS, Spalten = Perioden).
+
+    KGV/KBV werden mit dem Schlusskurs am Stichtag berechnet; Division durch 0 ergibt NaN.
+    """
+    if inc.empty or bal.empty:
+        return pd.DataFrame(index=KPIS, dtype=float)
+    li = line_items(inc, bal)
+    price = _price_at(hist, li.columns)
+    items = {k: li.loc[k] for k in li.index}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        m = pd.DataFrame({
+            "Gewinnmarge": items["net_income"] / items["revenue"],
+            "EBITDA-Marge": items["ebitda"] / items["revenue"],
+            "EK-Rendite": items["net_income"] / items["equity"],
+            "KGV": price / items["eps"],
+            "Liquidität": items["current_assets"] / items["current_liabilities"],
+            "Verschuldung": items["total_debt"] / items["equity"],
+            # Spalten sind absteigend sortiert -> Vorjahr steht rechts daneben
+            "Wachstum": items["revenue"] / items["revenue"].shift(-1) - 1,
+            "KBV": price / (items["equity"] / items["shares"]),
+            "Asset Turnover": items["revenue"] / items["total_assets"],
+        }).T
+    return m.replace([np.inf, -np.inf], np.nan).loc[KPIS]
+
+
+def latest_kpis(matrix, info):
+    """Werte der jüngsten Periode; KGV/KBV wie bisher bevorzugt aus den aktuellen Yahoo-Kennzahlen."""
+    if matrix.empty or matrix.shape[1] == 0:
+        return {}
+    latest = matrix.iloc[:, 0]
+    out = {k: (None if pd.isna(v) else float(v)) for k, v in latest.items()}
+    for kpi, key in (("KGV", "trailingPE"), ("KBV", "priceToBook")):
+        if info.get(key) is not None:
+            out[kpi] = info[key]
+    return out
+
+
+def stack_kpis(matrices):
+    """Ticker -> Matrix  =>  eine Tabelle mit MultiIndex (Ticker, KPI) für Screening über viele Ticker."""
+    frames = {t: m for t, m in matrices.items() if not m.empty}
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, names=["Ticker", "KPI"])
+
@@ -0,0 +1,128 @@
+"""Messpunkte für den Hot-Path: Stufen-Zeiten, Cache-Treffer, sonstige Zähler und Export im Prometheus-Textformat.
+
+Export optional über Umgebungsvariablen:
+    ARES_METRICS_FILE=/pfad/ares.prom   Textdatei für den node_exporter-Textfile-Collector
+    ARES_METRICS_LOG=1                  jede Messung zusätzlich als JSON-Logzeile (Logger "ares.metrics")
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+log = logging.getLogger("ares.metrics")
+
+RESERVOIR = 1024  # letzte N Messungen je Stufe für p50/p95
+FLUSH_EVERY = 10  # Sekunden zwischen zwei Datei-Exports
+
+
+def _quantile(sorted_values, q):
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))]
+
+
+class Metrics:
+    def __init__(self, reservoir=RESERVOIR):
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=reservoir))
+        self._sums = defaultdict(float)
+        self._counts = defaultdict(int)
+        self._counters = defaultdict(int)
+        self._events = defaultdict(int)
+        self._gauges = {}
+        self._last_flush = 0.0
+        self._log_enabled = os.environ.get("ARES_METRICS_LOG") == "1"
+
+    @contextmanager
+    def stage(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - t0)
+
+    def observe(self, name, seconds):
+        with self._lock:
+            self._samples[name].append(seconds)
+            self._sums[name] += seconds
+            self._counts[name] += 1
+        if self._log_enabled:
+            log.info(json.dumps({"metric": "stage_seconds", "stage": name, "value": round(seconds, 6), "ts": time.time()}))
+
+    def count(self, cache, result, seconds=None):
+        """Cache-Ereignis: result = hit | stale | miss | evicted (stale = abgelaufen, aber sofort ausgeliefert)."""
+        with self._lock:
+            self._counters[(cache, result)] += 1
+        if seconds is not None:
+            self.observe(f"cache.{cache}", seconds)
+
+    def event(self, component, result):
+        """Zähler außerhalb der Caches, z.B. HTTP-Status, geteilte Abrufe oder Fehler beim Vorwärmen."""
+        with self._lock:
+            self._events[(component, result)] += 1
+
+    def events(self):
+        with self._lock:
+            return dict(self._events)
+
+    def gauge(self, name, value):
+        """Momentanwert, z.B. aktuelle Cache-Größe in Bytes."""
+        with self._lock:
+            self._gauges[name] = value
+
+    def gauges(self):
+        with self._lock:
+            return dict(self._gauges)
+
+    def snapshot(self):
+        """Stufe -> {count, sum, p50, p95, last} und (Cache, Ergebnis) -> Anzahl."""
+        with self._lock:
+            stages = {}
+            for name, samples in self._samples.items():
+                ordered = sorted(samples)
+                stages[name] = {
+                    "count": self._counts[name], "sum": self._sums[name],
+                    "p50": _quantile(ordered, 0.5), "p95": _quantile(ordered, 0.95), "last": samples[-1],
+                }
+            return stages, dict(self._counters)
+
+    def to_prometheus(self):
+        stages, counters = self.snapshot()
+        lines = ["# HELP ares_stage_seconds Laufzeit je Stufe (Quantile über die letzten Messungen).",
+                 "# TYPE ares_stage_seconds summary"]
+        for name, s in sorted(stages.items()):
+            for q in ("0.5", "0.95"):
+                value = s["p50"] if q == "0.5" else s["p95"]
+                lines.append(f'ares_stage_seconds{{stage="{name}",quantile="{q}"}} {value:.6f}')
+            lines.append(f'ares_stage_seconds_sum{{stage="{name}"}} {s["sum"]:.6f}')
+            lines.append(f'ares_stage_seconds_count{{stage="{name}"}} {s["count"]}')
+        lines += ["# HELP ares_cache_requests_total Cache-Zugriffe nach Ergebnis.",
+                  "# TYPE ares_cache_requests_total counter"]
+        for (cache, result), n in sorted(counters.items()):
+            lines.append(f'ares_cache_requests_total{{cache="{cache}",result="{result}"}} {n}')
+        lines += ["# HELP ares_requests_total Ereignisse außerhalb der Caches nach Komponente und Ergebnis.",
+                  "# TYPE ares_requests_total counter"]
+        for (component, result), n in sorted(self.events().items()):
+            lines.append(f'ares_requests_total{{component="{component}",result="{result}"}} {n}')
+        for name, value in sorted(self.gauges().items()):
+            lines += [f"# TYPE ares_{name} gauge", f"ares_{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+    def maybe_flush(self, path=None, force=False):
+        """Schreibt die Textdatei höchstens alle FLUSH_EVERY Sekunden (atomar über eine Temp-Datei)."""
+        path = path or os.environ.get("ARES_METRICS_FILE")
+        if not path or (not force and time.time() - self._last_flush < FLUSH_EVERY):
+            return False
+        self._last_flush = time.time()
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, path)
+        return True
+
+
+# Prozessweite Instanz (alle Streamlit-Sessions teilen sich einen Server-Prozess)
+METRICS = Metrics()
@@ -0,0 +1,118 @@
+"""Gemeinsame HTTP-Session für alle Yahoo-Aufrufe: Verbindungs-Pool, Token-Bucket und Retry bei 429/5xx.
+
+Einstellbar über Umgebungsvariablen:
+    ARES_RATE=4      Anfragen pro Sekunde (Dauerrate, prozessweit)
+    ARES_BURST=10    kurzzeitig erlaubte Spitze
+    ARES_RETRIES=3   Wiederholungen bei 429/5xx (exponentielles Backoff, Retry-After wird beachtet)
+    ARES_WARM_RESERVE=5  Tokens, die Hintergrund-Abrufe (Vorwärmen) interaktiven Abrufen freihalten
+"""
+import os
+import random
+import threading
+import time
+
+from ares.metrics import METRICS
+
+try:
+    # yfinance bevorzugt curl_cffi (Browser-Fingerprint); ohne curl_cffi geht es mit requests
+    from curl_cffi.requests import Session as _BaseSession
+    _SESSION_KWARGS = {"impersonate": "chrome"}
+except ImportError:  # pragma: no cover
+    from requests import Session as _BaseSession
+    _SESSION_KWARGS = {}
+
+RATE = float(os.environ.get("ARES_RATE", "4"))
+BURST = int(os.environ.get("ARES_BURST", "10"))
+RETRIES = int(os.environ.get("ARES_RETRIES", "3"))
+WARM_RESERVE = int(os.environ.get("ARES_WARM_RESERVE", str(BURST // 2)))
+BACKOFF = 0.5  # Sekunden vor dem ersten Retry, danach verdoppelt
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Erlaubt `burst` Anfragen am Stück und danach `rate` pro Sekunde; `acquire` wartet bei Bedarf."""
+
+    def __init__(self, rate=RATE, burst=BURST):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, reserve=0):
+        """Nimmt ein Token, aber nur, wenn danach noch `reserve` übrig bleiben (niedrige Priorität).
+        Rückgabe: Wartezeit in Sekunden."""
+        need = 1 + min(reserve, self.burst - 1)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= need:
+                    self._tokens -= 1
+                    return waited
+                delay = (need - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+_local = threading.local()
+
+
+def mark_background():
+    """Kennzeichnet den aktuellen Thread als Hintergrund-Arbeit: seine Anfragen lassen WARM_RESERVE
+    Tokens für interaktive Abrufe übrig, `fetch_parts` nutzt den eigenen Hintergrund-Pool."""
+    _local.background = True
+
+
+def is_background():
+    return getattr(_local, "background", False)
+
+
+def _retry_after(response):
+    value = response.headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class RateLimitedSession(_BaseSession):
+    """Session mit Token-Bucket vor jeder Anfrage und Backoff bei Drosselung (429) oder Serverfehlern."""
+
+    def __init__(self, bucket=None, retries=RETRIES, backoff=BACKOFF, reserve=WARM_RESERVE, **kwargs):
+        super().__init__(**{**_SESSION_KWARGS, **kwargs})
+        self.bucket = bucket or TokenBucket()
+        self.retries = retries
+        self.backoff = backoff
+        self.reserve = reserve
+
+    def request(self, method, url, *args, **kwargs):
+        for attempt in range(self.retries + 1):
+            waited = self.bucket.acquire(self.reserve if is_background() else 0)
+            if waited:
+                METRICS.observe("http.wait", waited)
+            response = super().request(method, url, *args, **kwargs)
+            status = response.status_code
+            METRICS.event("http", str(status) if status in RETRY_STATUS else "ok")
+            if status not in RETRY_STATUS or attempt == self.retries:
+                return response
+            # Jitter verhindert, dass alle Threads nach dem Backoff gleichzeitig wieder anklopfen
+            delay = _retry_after(response) or self.backoff * 2 ** attempt * (1 + random.random())
+            METRICS.event("http", "retry")
+            time.sleep(delay)
+        return response
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def shared_session():
+    """Eine Session pro Prozess – Verbindungen, Cookies/Crumb und das Ratenlimit werden geteilt."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = RateLimitedSession()
+        return _session
@@ -0,0 +1,279 @@
+"""Datenquellen hinter einer gemeinsamen Schnittstelle: Yahoo (live) oder aufgezeichnete Fixtures.
+
+Auswahl über die Umgebungsvariable ARES_PROVIDER:
+    yahoo (Standard)
+    fixture:/pfad/zu/fixtures        optional ARES_FIXTURE_LATENCY=0.05 (Sekunden je Aufruf)
+"""
+import io
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+import yfinance as yf
+
+from ares.cache import SingleFlight
+from ares.metrics import METRICS
+from ares.net import shared_session
+
+
+def earnings_date(cal):
+    """Nächster Earnings-Termin aus `Ticker.calendar` (Dict in neuen, DataFrame in alten yfinance-Versionen)."""
+    if cal is None:
+        return None
+    if isinstance(cal, dict):
+        dates = cal.get("Earnings Date") or []
+        value = dates[0] if dates else None
+    elif isinstance(cal, pd.DataFrame):
+        value = cal.iloc[0, 0] if not cal.empty else None
+    else:
+        value = None
+    return pd.Timestamp(value) if value is not None and pd.notnull(value) else None
+
+
+_US_LISTINGS = [
+    ("https://www.nasdaqtrader.com/dynamic/SymDir/nasdaqlisted.txt", "Symbol", None),
+    ("https://www.nasdaqtrader.com/dynamic/SymDir/otherlisted.txt", "ACT Symbol", "Exchange"),
+]
+_US_EXCHANGES = {"A": "NYSEAM", "N": "NYSE", "P": "ARCA", "Z": "CBOE", "V": "IEX"}
+
+
+class YahooProvider:
+    """Alle Aufrufe laufen über die gemeinsame, ratenbegrenzte Session; identische gleichzeitige
+    Aufrufe (z.B. mehrere Sessions mit demselben Ticker) gehen nur einmal ans Netz."""
+    name = "yahoo"
+
+    def __init__(self, session=None):
+        self.session = session
+        self._flight = SingleFlight(METRICS)
+
+    def _ticker(self, ticker):
+        return yf.Ticker(ticker, session=self.session or shared_session())
+
+    def history(self, ticker, period="max", interval="1d", start=None):
+        def fetch():
+            tk = self._ticker(ticker)
+            if start is not None:
+                return tk.history(start=start, interval=interval)
+            return tk.history(period=period, interval=interval)
+        return self._flight.do(("history", ticker, period, interval, str(start)), fetch)
+
+    def info(self, ticker):
+        return self._flight.do(("info", ticker), lambda: self._ticker(ticker).info)
+
+    def financials(self, ticker):
+        return self._flight.do(("financials", ticker), lambda: self._ticker(ticker).financials)
+
+    def balance_sheet(self, ticker):
+        return self._flight.do(("balance_sheet", ticker), lambda: self._ticker(ticker).balance_sheet)
+
+    def cashflow(self, ticker):
+        return self._flight.do(("cashflow", ticker), lambda: self._ticker(ticker).cashflow)
+
+    def calendar(self, ticker):
+        return self._flight.do(("calendar", ticker), lambda: earnings_date(self._ticker(ticker).calendar))
+
+    def earnings_calendar(self, start, end, page_size=100, max_pages=50):
+        """Alle Earnings-Termine von `start` bis `end` aus dem Sammelkalender (nur US-Börsen),
+        seitenweise je `page_size` Termine -> DataFrame mit Spalten ticker, date."""
+        def fetch():
+            cal = yf.Calendars(start, end, session=self.session or shared_session())
+            pages = []
+            for page in range(max_pages):
+                df = cal.get_earnings_calendar(filter_most_active=False, limit=page_size,
+                                               offset=page * page_size, force=True)
+                if df.empty:
+                    break
+                pages.append(df)
+                if len(df) < page_size:
+                    break
+            if not pages:
+                return pd.DataFrame({"ticker": pd.Series(dtype=str), "date": pd.Series(dtype="datetime64[s]")})
+            events = pd.concat(pages)
+            dates = pd.to_datetime(events["Event Start Date"])
+            if dates.dt.tz is not None:
+                dates = dates.dt.tz_convert("America/New_York").dt.tz_localize(None)
+            return pd.DataFrame({"ticker": events.index.astype(str), "date": dates.dt.normalize().to_numpy()})
+        return self._flight.do(("earnings_calendar", str(start), str(end)), fetch)
+
+    def listings(self):
+        """US-Börsenlisten von NASDAQ Trader (NASDAQ, NYSE, NYSE American, Arca, Cboe) im Yahoo-Format
+        -> DataFrame mit Spalten symbol, name, exchange. Yahoo selbst bietet kein Gesamtverzeichnis."""
+        session = self.session or shared_session()
+        frames = []
+        for url, column, exchange in _US_LISTINGS:
+            response = session.get(url, timeout=30)
+            response.raise_for_status()
+            df = pd.read_csv(io.StringIO(response.text), sep="|", dtype=str)
+            df = df[df["Test Issue"] == "N"]  # letzte Zeile ("File Creation Time") fällt hier mit heraus
+            frames.append(pd.DataFrame({
+                # Yahoo schreibt Aktiengattungen mit Bindestrich (BRK.B -> BRK-B, Vorzugsaktien BAC$K -> BAC-PK)
+                "symbol": df[column].str.replace(".", "-", regex=False).str.replace("$", "-P", regex=False),
+                "name": df["Security Name"],
+                "exchange": df[exchange].map(_US_EXCHANGES).fillna("US") if exchange else "NASDAQ",
+            }))
+        return pd.concat(frames, ignore_index=True)
+
+    def download(self, symbols, period="6mo", interval="1d"):
+        """Ein gebündelter yf.download-Aufruf -> DataFrame mit Spalten (Feld, Ticker)."""
+        key = ("download", tuple(symbols), period, interval)
+        return self._flight.do(key, lambda: self._download(list(symbols), period, interval))
+
+    def _download(self, symbols, period, interval):
+        panel = yf.download(symbols, period=period, interval=interval, group_by="column", auto_adjust=True,
+                            threads=True, progress=False, session=self.session or shared_session())
+        if not isinstance(panel.columns, pd.MultiIndex):
+            panel.columns = pd.MultiIndex.from_product([panel.columns, list(symbols)])
+        return panel
+
+
+# Zeitraum -> Länge, für das Zuschneiden aufgezeichneter Historien
+_PERIODS = {
+    "1d": pd.DateOffset(days=1), "5d": pd.DateOffset(days=5), "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3), "6mo": pd.DateOffset(months=6), "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2), "5y": pd.DateOffset(years=5), "10y": pd.DateOffset(years=10),
+}
+
+_STATEMENTS = ("financials", "balance_sheet", "cashflow")
+
+
+class FixtureProvider:
+    """Spielt aufgezeichnete DataFrames von der Platte ab – ohne Netzwerk, mit optional simulierter Latenz.
+
+    Layout je Ticker: <root>/<TICKER>/history.parquet, history_<interval>.parquet, info.json,
+    financials.parquet, balance_sheet.parquet, cashflow.parquet, calendar.json;
+    optional <root>/earnings_calendar.parquet (Spalten ticker, date) für den Sammelkalender und
+    <root>/listings.csv (symbol, name, exchange) für das Symbolverzeichnis.
+    Fehlt eine Datei, wird FileNotFoundError geworfen (entspricht einem fehlgeschlagenen Abruf).
+    """
+    name = "fixture"
+
+    def __init__(self, root, latency=0.0):
+        self.root = Path(root)
+        self.latency = latency
+        self.calls = 0
+        self._calls_lock = threading.Lock()
+
+    def _wait(self):
+        with self._calls_lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _dir(self, ticker):
+        return self.root / ticker.upper()
+
+    def history(self, ticker, period="max", interval="1d", start=None):
+        self._wait()
+        name = "history.parquet" if interval == "1d" else f"history_{interval}.parquet"
+        hist = pd.read_parquet(self._dir(ticker) / name)
+        if start is not None:
+            return hist[hist.index.date >= pd.Timestamp(start).date()]
+        if period in _PERIODS and not hist.empty and interval == "1d":
+            return hist[hist.index > hist.index[-1] - _PERIODS[period]]
+        return hist
+
+    def info(self, ticker):
+        self._wait()
+        return json.loads((self._dir(ticker) / "info.json").read_text())
+
+    def _statement(self, ticker, name):
+        self._wait()
+        # Perioden liegen als Zeilen in der Datei (Parquet braucht Text-Spaltennamen)
+        return pd.read_parquet(self._dir(ticker) / f"{name}.parquet").T
+
+    def financials(self, ticker):
+        return self._statement(ticker, "financials")
+
+    def balance_sheet(self, ticker):
+        return self._statement(ticker, "balance_sheet")
+
+    def cashflow(self, ticker):
+        return self._statement(ticker, "cashflow")
+
+    def calendar(self, ticker):
+        self._wait()
+        value = json.loads((self._dir(ticker) / "calendar.json").read_text()).get("earnings_date")
+        return pd.Timestamp(value) if value else None
+
+    def earnings_calendar(self, start, end):
+        """Aus <root>/earnings_calendar.parquet, sonst aus den calendar.json aller Ticker zusammengesetzt."""
+        self._wait()
+        path = self.root / "earnings_calendar.parquet"
+        if path.exists():
+            events = pd.read_parquet(path)
+        else:
+            rows = [(d.name, json.loads((d / "calendar.json").read_text()).get("earnings_date"))
+                    for d in sorted(self.root.iterdir()) if (d / "calendar.json").exists()]
+            events = pd.DataFrame([(t, pd.Timestamp(v)) for t, v in rows if v], columns=["ticker", "date"])
+        events["date"] = pd.to_datetime(events["date"])
+        return events[(events["date"] >= pd.Timestamp(start)) & (events["date"] <= pd.Timestamp(end))].reset_index(drop=True)
+
+    def listings(self):
+        """Aus <root>/listings.csv (symbol,name,exchange), sonst die aufgezeichneten Ticker mit Namen aus info.json."""
+        self._wait()
+        path = self.root / "listings.csv"
+        if path.exists():
+            return pd.read_csv(path, dtype=str)
+        rows = []
+        for d in sorted(self.root.iterdir()):
+            if (d / "info.json").exists():
+                info = json.loads((d / "info.json").read_text())
+                rows.append((d.name, info.get("longName") or info.get("shortName") or "", info.get("exchange") or ""))
+        return pd.DataFrame(rows, columns=["symbol", "name", "exchange"])
+
+    def download(self, symbols, period="6mo", interval="1d"):
+        self._wait()
+        frames = {}
+        for s in symbols:
+            path = self._dir(s) / "history.parquet"
+            if path.exists():
+                hist = pd.read_parquet(path)
+                if period in _PERIODS and not hist.empty:
+                    hist = hist[hist.index > hist.index[-1] - _PERIODS[period]]
+                frames[s] = hist[[c for c in ("Open", "High", "Low", "Close", "Volume") if c in hist.columns]]
+        if not frames:
+            return pd.DataFrame()
+        panel = pd.concat(frames, axis=1)
+        return panel.swaplevel(0, 1, axis=1).sort_index(axis=1)
+
+
+def record(ticker, root, provider=None, intraday=("5m", "15m")):
+    """Zeichnet alle Bausteine eines Tickers als Fixture auf (z.B. einmalig mit Netzwerk)."""
+    provider = provider or YahooProvider()
+    d = Path(root) / ticker.upper()
+    d.mkdir(parents=True, exist_ok=True)
+    provider.history(ticker).to_parquet(d / "history.parquet")
+    for interval, period in zip(intraday, ("1d", "5d")):
+        provider.history(ticker, period=period, interval=interval).to_parquet(d / f"history_{interval}.parquet")
+    (d / "info.json").write_text(json.dumps(provider.info(ticker), default=str))
+    for name in _STATEMENTS:
+        frame = getattr(provider, name)(ticker)
+        frame.T.set_axis(frame.index.astype(str), axis=1).to_parquet(d / f"{name}.parquet")
+    cal = provider.calendar(ticker)
+    (d / "calendar.json").write_text(json.dumps({"earnings_date": str(cal.date()) if cal is not None else None}))
+
+
+def provider_from_env():
+    spec = os.environ.get("ARES_PROVIDER", "yahoo")
+    if spec.startswith("fixture:"):
+        return FixtureProvider(spec.split(":", 1)[1], float(os.environ.get("ARES_FIXTURE_LATENCY", "0")))
+    return YahooProvider()
+
+
+_provider = None
+
+
+def get_provider():
+    global _provider
+    if _provider is None:
+        _provider = provider_from_env()
+    return _provider
+
+
+def set_provider(provider):
+    """Ersetzt die Datenquelle prozessweit (Benchmarks, Offline-Betrieb)."""
+    global _provider
+    _provider = provider
@@ -0,0 +1,97 @@
+"""Watchlist-Screener: Ampel, ATR-Stop und Positionsgröße für viele Ticker in einem Durchlauf."""
+import re
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from ares.core import EARNINGS_DAYS, STOP_ATR_MULT, VOL_MIN
+from ares.indicators import ATR_WINDOW, atr_last, rolling_last
+
+# Handelswährung aus dem Börsenkürzel ableiten (spart einen info-Aufruf pro Ticker)
+SUFFIX_CURRENCY = {
+    "DE": "EUR", "F": "EUR", "VI": "EUR", "PA": "EUR", "AS": "EUR", "MI": "EUR", "MC": "EUR",
+    "BR": "EUR", "LS": "EUR", "HE": "EUR", "IR": "EUR", "L": "GBp", "SW": "CHF", "TO": "CAD",
+    "V": "CAD", "AX": "AUD", "HK": "HKD", "T": "JPY", "ST": "SEK", "OL": "NOK", "CO": "DKK",
+}
+
+
+def parse_tickers(text):
+    """Komma-, Leerzeichen- oder Zeilen-getrennte Liste -> eindeutige, große Symbole (Reihenfolge bleibt)."""
+    seen = dict.fromkeys(t.upper() for t in re.split(r"[\s,;]+", text) if t)
+    return list(seen)
+
+
+def guess_currency(ticker):
+    suffix = ticker.rsplit(".", 1)[1] if "." in ticker else ""
+    return SUFFIX_CURRENCY.get(suffix, "USD")
+
+
+def _right_align(values, valid):
+    """Schiebt pro Spalte die gültigen Zeilen ans Ende (Börsen mit unterschiedlichen Feiertagen)."""
+    order = np.argsort(valid, axis=0, kind="stable")
+    return np.take_along_axis(values, order, axis=0)
+
+
+def screen_panel(panel, acc_eur, risk_p, fx_rates, earnings=None, overnight=True, today=None, tickers=None):
+    """Wertet das Panel vektorisiert aus. `fx_rates`: Währung -> Kurs in EUR.
+    `earnings`: Ticker -> nächster Termin (aus dem Earnings-Index); fehlt er, zählt nur das Volumen.
+    `tickers`: angefragte Symbole – was im Download fehlt, erscheint als N/A-Zeile statt zu verschwinden."""
+    has_close = not panel.empty and "Close" in panel.columns.get_level_values(0)
+    close = panel["Close"] if has_close else pd.DataFrame()
+    # yf.download liefert für fehlgeschlagene Symbole reine NaN-Spalten
+    loaded = list(close.columns[close.notna().any()])
+    failed = [t for t in (tickers or close.columns) if t not in loaded]
+    if not loaded:
+        return _failed_rows(failed)
+    fields = {f: panel[f][loaded].astype(float) for f in ("High", "Low", "Close", "Volume")}
+    tickers = list(fields["Close"].columns)
+    close = fields["Close"].to_numpy()
+    valid = ~np.isnan(close)
+    h, l, c, v = (_right_align(fields[f].to_numpy(), valid) for f in ("High", "Low", "Close", "Volume"))
+    n_valid = valid.sum(axis=0)
+
+    atr = atr_last(h, l, c, ATR_WINDOW)
+    vol_20d = rolling_last(v, 20)
+    curr_p, prev_p = c[-1], c[-2]
+
+    currency = np.array([guess_currency(t) for t in tickers])
+    fx = np.array([fx_rates.get(cur, np.nan) for cur in currency])
+    risk_eur = acc_eur * (risk_p / 100)
+    stop_pct = atr / curr_p * STOP_ATR_MULT * 100
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shares = np.floor((risk_eur / fx) / (curr_p * stop_pct / 100))
+
+    # Ohne gemeldetes Volumen (NaN) ist die Liquidität ungeprüft -> ROT statt stillschweigend GRÜN
+    low_vol = ~(vol_20d >= VOL_MIN)
+    vol_reason = np.where(np.isnan(vol_20d), "Volumen unbekannt", "Volumen < 500k")
+    today = today or date.today()
+    days_to_earn = np.array([(earnings[t].date() - today).days if earnings and earnings.get(t) is not None else np.nan
+                             for t in tickers], dtype=float)
+    near_earn = days_to_earn <= EARNINGS_DAYS[overnight]
+    enough = n_valid > ATR_WINDOW
+    out = pd.DataFrame({
+        "Ticker": tickers,
+        "Kurs": curr_p,
+        "Währung": currency,
+        "Tagesänderung %": (curr_p - prev_p) / prev_p * 100,
+        "Ø Vol 20T": vol_20d,
+        "ATR(14)": atr,
+        "Stop-Abstand %": stop_pct,
+        "Stop-Preis": curr_p * (1 - stop_pct / 100),
+        "Stückzahl": shares,
+        "Earnings in Tagen": days_to_earn,
+        "Status": np.where(low_vol | near_earn, "ROT", "GRÜN"),
+        "Grund": np.where(near_earn, np.where(low_vol, np.char.add("Earnings & ", vol_reason), "Earnings"),
+                          np.where(low_vol, vol_reason, "")),
+    })
+    out.loc[~enough, ["Status", "Grund"]] = ["N/A", "Zu wenig Kursdaten"]
+    if failed:
+        out = pd.concat([out, _failed_rows(failed)], ignore_index=True)
+    return out.sort_values(["Status", "Stop-Abstand %"]).reset_index(drop=True)
+
+
+def _failed_rows(tickers):
+    """Zeilen für Symbole ohne Kursdaten im gebündelten Download."""
+    return pd.DataFrame({"Ticker": tickers, "Währung": [guess_currency(t) for t in tickers],
+                         "Status": "N/A", "Grund": "Nicht geladen"})
@@ -0,0 +1,103 @@
+"""Persistenter Kurs-Speicher: eine Parquet-Datei pro Ticker, inkrementell aktualisiert."""
+import os
+import re
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+DATA_DIR = Path(os.environ.get("ARES_DATA_DIR", Path(__file__).resolve().parent.parent / ".ares_data"))
+
+# Anzahl bereits gespeicherter Bars, die bei jedem Update erneut geladen werden.
+# Der letzte Bar kann ein unvollständiger Intraday-Stand sein, die übrigen dienen als Abgleich.
+OVERLAP_BARS = 5
+
+# Relative Toleranz beim Abgleich der Überlappung (yfinance liefert adjustierte Kurse)
+ADJUST_RTOL = 1e-4
+
+
+def _safe_name(ticker):
+    return re.sub(r"[^A-Za-z0-9._=^-]", "_", ticker.upper())
+
+
+class PriceStore:
+    """Hält die Tages-Historie je Ticker auf der Platte und lädt nur neue Bars nach.
+
+    `fetch(start)` liefert die Historie ab `start` (inklusive), bei `start=None` die komplette Historie.
+    """
+
+    def __init__(self, root=None):
+        self.root = Path(root) if root else DATA_DIR / "prices"
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def path(self, ticker):
+        return self.root / f"{_safe_name(ticker)}.parquet"
+
+    def _lock(self, ticker):
+        with self._locks_guard:
+            return self._locks.setdefault(_safe_name(ticker), threading.Lock())
+
+    def read(self, ticker):
+        p = self.path(ticker)
+        if not p.exists():
+            return None
+        try:
+            return pd.read_parquet(p)
+        except Exception:
+            # Defekte Datei -> wie nicht vorhanden behandeln, wird beim nächsten Update neu geschrieben
+            return None
+
+    def write(self, ticker, df):
+        self.root.mkdir(parents=True, exist_ok=True)
+        p = self.path(ticker)
+        tmp = p.with_suffix(".parquet.tmp")
+        df.to_parquet(tmp)
+        os.replace(tmp, p)
+
+    def update(self, ticker, fetch):
+        with self._lock(ticker):
+            stored = self.read(ticker)
+            if stored is None or stored.empty:
+                return self._full(ticker, fetch, stored)
+
+            start = stored.index[-min(OVERLAP_BARS, len(stored))]
+            fresh = fetch(start.date())
+            if fresh is None or fresh.empty:
+                return stored
+
+            if self._needs_full_reload(stored, fresh):
+                return self._full(ticker, fetch, stored)
+
+            # Überlappende Bars (inkl. des evtl. unvollständigen letzten Bars) durch frische Werte ersetzen
+            merged = pd.concat([stored[stored.index < fresh.index[0]], fresh])
+            merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+            self.write(ticker, merged)
+            return merged
+
+    def _full(self, ticker, fetch, stored):
+        hist = fetch(None)
+        if hist is None or hist.empty:
+            return stored if stored is not None else pd.DataFrame()
+        self.write(ticker, hist)
+        return hist
+
+    @staticmethod
+    def _needs_full_reload(stored, fresh):
+        """Dividenden/Splits verschieben rückwirkend alle adjustierten Kurse -> komplett neu laden."""
+        for col in ("Dividends", "Stock Splits"):
+            if col not in fresh.columns:
+                continue
+            events = fresh[col].fillna(0)
+            known = stored[col].reindex(fresh.index).fillna(0) if col in stored.columns else 0
+            if ((events != 0) & (events != known)).any():
+                return True
+
+        # Abgleich ohne den letzten gespeicherten Bar, der noch unvollständig gewesen sein kann
+        common = stored.index[:-1].intersection(fresh.index)
+        if common.empty:
+            # Keine Überlappung (z.B. Zeitzonen-/Kalenderwechsel) -> Lücke nicht riskieren
+            return fresh.index[0] > stored.index[-1]
+        old = stored.loc[common, "Close"]
+        new = fresh.loc[common, "Close"]
+        return not ((old - new).abs() <= ADJUST_RTOL * old.abs()).all()
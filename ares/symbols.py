@@ -0,0 +1,303 @@
+"""Lokales Symbolverzeichnis: Präfix-, Namens- und Tippfehlersuche ohne Netzwerk.
+
+Das Verzeichnis wird aus Börsenlisten gebaut (`provider.listings()`, zusätzliche CSV-Dateien über
+ARES_LISTINGS, bereits geladene Ticker) und als sortierte NumPy-Arrays abgelegt, die per
+Memory-Mapping geöffnet werden – auch 100k+ Einträge kosten beim Start kaum Zeit und Speicher.
+
+    Symbol-Präfix   Binärsuche im sortierten Symbol-Array
+    Name            Binärsuche je Namenswort im sortierten Wort-Array (alle Wörter müssen passen)
+    Tippfehler      Symbole mit Abstand 1 (ein Zeichen zu viel/zu wenig/falsch, Dreher) über ein
+                    sortiertes Array aller Ein-Zeichen-Löschungen (SymSpell)
+
+    python -m ares.symbols --refresh                 # Listen neu laden (sonst höchstens wöchentlich)
+    python -m ares.symbols appel                     # Suche testen
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ares.metrics import METRICS
+from ares.store import DATA_DIR
+
+log = logging.getLogger(__name__)
+
+LISTINGS = os.environ.get("ARES_LISTINGS", "")  # zusätzliche CSV-Dateien (symbol,name[,exchange]), mit os.pathsep getrennt
+MAX_AGE = 7 * 86400  # Sekunden; Börsenlisten ändern sich langsam
+NAME_BYTES = 48  # angezeigter Name, UTF-8, abgeschnitten
+
+# Yahoo-Symbole, die in keiner Börsenliste stehen: Indizes (^GSPC), FX (EURUSD=X), Futures (ES=F), Krypto
+_UNLISTED = re.compile(r"^\^|=|-(USD|EUR|GBP|CHF)$")
+
+
+@dataclass(frozen=True)
+class Listing:
+    symbol: str
+    name: str
+    exchange: str
+
+
+def normalize_name(text):
+    """Großbuchstaben ohne Akzente, nur Buchstaben/Ziffern -> Liste der Wörter."""
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode().upper()
+    return re.findall(r"[A-Z0-9]+", text)
+
+
+def suffix(symbol):
+    """Börsenkürzel ('DE' bei SAP.DE, '' für US-Symbole)."""
+    return symbol.rsplit(".", 1)[1] if "." in symbol else ""
+
+
+def _deletes(symbol):
+    return {symbol[:i] + symbol[i + 1:] for i in range(len(symbol))} - {""}
+
+
+def _equal(arr, key):
+    """Indexbereich der Einträge gleich `key` (Bytes). Längere Schlüssel würden auf die Feldbreite
+    gekürzt und fälschlich passen – sie können gar nicht vorkommen."""
+    if len(key) > arr.itemsize:
+        return 0, 0
+    return np.searchsorted(arr, key, side="left"), np.searchsorted(arr, key, side="right")
+
+
+def _range(arr, prefix):
+    """Indexbereich aller Einträge, die mit `prefix` (Bytes) beginnen."""
+    if len(prefix) >= arr.itemsize:
+        return _equal(arr, prefix)
+    return np.searchsorted(arr, prefix, side="left"), np.searchsorted(arr, prefix + b"\xff", side="left")
+
+
+def build(listings, root, suffixes=None):
+    """Schreibt das Verzeichnis aus einem DataFrame (symbol, name, exchange) nach `root` (neue Version).
+    `suffixes`: vollständig gelistete Börsen (Standard: alle vorkommenden). Rückgabe: Pfad der Version."""
+    df = listings.assign(symbol=listings["symbol"].astype(str).str.strip().str.upper())
+    df = df[df["symbol"].str.fullmatch(r"[A-Z0-9.^=&-]{1,20}")]
+    df = df.drop_duplicates("symbol").sort_values("symbol", kind="stable").reset_index(drop=True)
+    names = df["name"].fillna("").astype(str)
+
+    symbols = df["symbol"].to_numpy().astype("S")
+    words, word_rows = [], []
+    for row, name in enumerate(names):
+        for w in set(normalize_name(name)):
+            words.append(w)
+            word_rows.append(row)
+    dels, del_rows = [], []
+    for row, symbol in enumerate(df["symbol"]):
+        for d in _deletes(symbol):
+            dels.append(d)
+            del_rows.append(row)
+
+    root = Path(root)
+    version = root / f"v{time.time_ns()}"
+    version.mkdir(parents=True)
+    arrays = {
+        "symbols": symbols,
+        "names": np.array([n.encode("utf-8")[:NAME_BYTES] for n in names], dtype=f"S{NAME_BYTES}"),
+        "exchanges": df.get("exchange", pd.Series("", index=df.index)).fillna("").astype(str).to_numpy().astype("S8"),
+    }
+    for key, keys, rows in (("words", words, word_rows), ("deletes", dels, del_rows)):
+        keys = np.array(keys, dtype="S") if keys else np.array([], dtype="S1")
+        order = np.argsort(keys, kind="stable")
+        arrays[key], arrays[f"{key}_rows"] = keys[order], np.asarray(rows, dtype=np.int32)[order]
+    for key, arr in arrays.items():
+        np.save(version / f"{key}.npy", arr)
+    if suffixes is None:
+        suffixes = {suffix(s) for s in df["symbol"]}
+    meta = {"count": len(df), "suffixes": sorted(suffixes), "built_at": time.time()}
+    (version / "meta.json").write_text(json.dumps(meta))
+    # Zeiger zuletzt und atomar umsetzen – Leser sehen immer eine vollständige Version
+    tmp = root / "CURRENT.tmp"
+    tmp.write_text(version.name)
+    os.replace(tmp, root / "CURRENT")
+    return version
+
+
+def read_listing_files(paths=LISTINGS):
+    """Zusätzliche Listen (z.B. europäische Börsen) als CSV mit Spalten symbol,name[,exchange]."""
+    frames = []
+    for path in filter(None, paths.split(os.pathsep) if isinstance(paths, str) else paths):
+        try:
+            frames.append(pd.read_csv(path, dtype=str).rename(columns=str.lower))
+        except FileNotFoundError:
+            log.warning("Symbolliste %s fehlt", path)
+    return frames
+
+
+class SymbolIndex:
+    """Memory-gemapptes Symbolverzeichnis unter ARES_DATA_DIR/symbols; leer, solange nichts gebaut wurde."""
+
+    def __init__(self, root=None):
+        self.root = Path(root) if root else DATA_DIR / "symbols"
+        self._lock = threading.Lock()
+        self._arrays = {}
+        self._suffixes = set()
+        self.meta = {"count": 0, "suffixes": [], "built_at": None}
+        self.load()
+
+    def __len__(self):
+        return self.meta["count"]
+
+    def stale(self, now=None):
+        return self.meta["built_at"] is None or (now or time.time()) - self.meta["built_at"] > MAX_AGE
+
+    def load(self):
+        pointer = self.root / "CURRENT"
+        if not pointer.exists():
+            return self
+        version = self.root / pointer.read_text().strip()
+        try:
+            arrays = {p.stem: np.load(p, mmap_mode="r") for p in version.glob("*.npy")}
+            meta = json.loads((version / "meta.json").read_text())
+        except (OSError, ValueError):
+            return self
+        # Eine Zuweisung je Attribut – laufende Suchen arbeiten mit der alten Version weiter
+        self._arrays, self.meta = arrays, meta
+        self._suffixes = set(meta["suffixes"])
+        return self
+
+    def _listing(self, row):
+        a = self._arrays
+        return Listing(a["symbols"][row].decode(), a["names"][row].decode("utf-8", "ignore"),
+                       a["exchanges"][row].decode())
+
+    # --- Abfragen ---
+    def known(self, symbol):
+        symbols = self._arrays.get("symbols")
+        if symbols is None or not len(symbols):
+            return False
+        lo, hi = _equal(symbols, symbol.upper().encode())
+        return hi > lo
+
+    def accepts(self, symbol):
+        """False nur, wenn das Symbol sicher nicht existiert: Börse im Verzeichnis vorhanden, Symbol nicht.
+        Ohne Verzeichnis, für nicht gelistete Börsen, Indizes/FX/Futures/Krypto und US-Symbole ohne
+        Börsenkürzel immer True – die US-Listen enthalten weder OTC-Werte (TCEHY) noch Fonds (VFIAX)."""
+        symbol = symbol.upper()
+        if not len(self) or _UNLISTED.search(symbol) or suffix(symbol) not in self._suffixes or not suffix(symbol):
+            return True
+        return self.known(symbol)
+
+    def prefix(self, query, limit=8):
+        """Symbole, die mit `query` beginnen – kürzeste zuerst."""
+        symbols = self._arrays["symbols"]
+        lo, hi = _range(symbols, query.upper().encode())
+        rows = np.arange(lo, min(hi, lo + 50 * limit))
+        lengths = np.char.str_len(np.asarray(symbols[rows]))
+        return rows[np.argsort(lengths, kind="stable")][:limit].tolist()
+
+    def by_name(self, query, limit=8):
+        """Zeilen, deren Name zu jedem Wort der Anfrage ein Wort mit diesem Präfix enthält – kürzeste Namen zuerst."""
+        words, word_rows = self._arrays["words"], self._arrays["words_rows"]
+        terms = normalize_name(query)
+        if not terms:
+            return []
+        cap = 50 * limit
+        ranges = [_range(words, w.encode()) for w in terms]
+        if len(ranges) == 1:
+            # Ein Wort: die ersten Treffer genügen, kein Mengen-Schnitt nötig
+            lo, hi = ranges[0]
+            hits = np.array(list(dict.fromkeys(word_rows[lo:min(hi, lo + cap)].tolist())), dtype=np.int64)
+        else:
+            # Vom seltensten Wort ausgehen; Mitgliedschaft per Lookup-Tabelle statt Sortieren
+            ranges.sort(key=lambda r: r[1] - r[0])
+            hits = np.unique(word_rows[slice(*ranges[0])])
+            for lo, hi in ranges[1:]:
+                if not len(hits):
+                    break
+                hits = hits[np.isin(hits, word_rows[lo:hi], kind="table")]
+            hits = hits[:cap]
+        if not len(hits):
+            return []
+        lengths = np.char.str_len(np.asarray(self._arrays["names"][hits]))
+        return hits[np.argsort(lengths, kind="stable")][:limit].tolist()
+
+    def fuzzy(self, query, limit=8):
+        """Symbole mit Editierabstand 1 zu `query`."""
+        symbols, dels, del_rows = self._arrays["symbols"], self._arrays["deletes"], self._arrays["deletes_rows"]
+        q = query.upper()
+        rows = set()
+        for variant in _deletes(q) | {q}:
+            key = variant.encode()
+            if variant != q:
+                rows.update(range(*_equal(symbols, key)))  # Zeichen zu viel
+            lo, hi = _equal(dels, key)
+            rows.update(np.asarray(del_rows[lo:hi]).tolist())  # falsches/fehlendes Zeichen, Dreher
+        return sorted(rows, key=lambda r: (abs(len(symbols[r]) - len(q)), symbols[r]))[:limit]
+
+    def search(self, query, limit=8):
+        """Exaktes Symbol, dann Präfix, Name und Tippfehler -> Liste von `Listing`."""
+        query = query.strip()
+        if not len(self) or not query:
+            return []
+        t0 = time.perf_counter()
+        rows = []
+        for part in (self.prefix(query, limit), self.by_name(query, limit), self.fuzzy(query, limit)):
+            rows += [r for r in part if r not in rows]
+        METRICS.observe("symbols.search", time.perf_counter() - t0)
+        return [self._listing(r) for r in rows[:limit]]
+
+    # --- Aufbau ---
+    def refresh(self, provider=None, extra=LISTINGS, store=None, force=False):
+        """Baut das Verzeichnis neu (ohne `force` höchstens alle MAX_AGE Sekunden).
+        Quellen: `provider.listings()`, CSV-Dateien aus `extra`, Ticker im Kurs-Speicher `store`."""
+        from ares.providers import get_provider
+
+        if not force and not self.stale():
+            return self
+        with self._lock:
+            t0 = time.perf_counter()
+            frames = read_listing_files(extra)
+            try:
+                frames.append((provider or get_provider()).listings())
+            except Exception as e:
+                log.warning("Börsenlisten nicht geladen: %s", f"{type(e).__name__}: {e}")
+            frames = [f for f in frames if not f.empty]
+            if not frames:
+                return self
+            # Nur Börsen aus echten Listen gelten als vollständig – dort werden unbekannte Symbole abgelehnt
+            suffixes = {suffix(s) for f in frames for s in f["symbol"].astype(str).str.upper()}
+            if store is not None and store.root.exists():
+                # Erfolgreich geladene Ticker sind gültig, auch wenn keine Liste sie kennt
+                frames.append(pd.DataFrame({"symbol": [p.stem for p in store.root.glob("*.parquet")], "name": ""}))
+            listings = pd.concat(frames, ignore_index=True)
+            # Einträge mit Namen vor den namenlosen aus dem Kurs-Speicher behalten
+            listings = listings.sort_values("name", key=lambda s: s.fillna("").eq(""), kind="stable")
+            version = build(listings, self.root, suffixes)
+            self.load()
+            for old in self.root.glob("v*"):
+                if old != version:
+                    shutil.rmtree(old, ignore_errors=True)
+            METRICS.observe("symbols.build", time.perf_counter() - t0)
+        return self
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m ares.symbols", description="Lokales Symbolverzeichnis.")
+    parser.add_argument("query", nargs="*", help="Suchbegriff (Symbol, Teil davon oder Firmenname)")
+    parser.add_argument("--refresh", action="store_true", help="Listen jetzt neu laden")
+    parser.add_argument("--limit", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    index = SymbolIndex()
+    if args.refresh or index.stale():
+        index.refresh(force=args.refresh)
+    print(f"{len(index)} Symbole, Börsen: {', '.join(s or 'US' for s in index.meta['suffixes'])}", file=sys.stderr)
+    if args.query:
+        for hit in index.search(" ".join(args.query), args.limit):
+            print(f"{hit.symbol:<12} {hit.exchange:<8} {hit.name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""Cache-Vorwärmen: Watchlist beim Start laden und im Hintergrund regelmäßig auffrischen.
+
+Einstellbar über Umgebungsvariablen:
+    ARES_WATCHLIST=watchlist.txt   Tickersymbole (Komma/Leerzeichen/Zeilen getrennt); ohne Datei nur beliebte Ticker
+    ARES_WARM_INTERVAL=900         Sekunden zwischen zwei Durchläufen (kleiner als die Daten-TTL halten)
+    ARES_WARM_WORKERS=2            gleichzeitige Ladevorgänge – bewusst klein, interaktive Abrufe gehen vor
+    ARES_WARM_TOP=20               zusätzlich die N zuletzt am häufigsten aufgerufenen Ticker
+"""
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from ares.metrics import METRICS
+from ares.net import mark_background
+from ares.screener import parse_tickers
+
+log = logging.getLogger(__name__)
+
+WATCHLIST = os.environ.get("ARES_WATCHLIST")
+WARM_INTERVAL = int(os.environ.get("ARES_WARM_INTERVAL", "900"))
+WARM_WORKERS = int(os.environ.get("ARES_WARM_WORKERS", "2"))
+WARM_TOP = int(os.environ.get("ARES_WARM_TOP", "20"))
+
+
+def read_watchlist(path):
+    """Ticker aus der Datei; fehlt sie, eine leere Liste (Datei darf im Betrieb geändert werden)."""
+    if not path:
+        return []
+    try:
+        return parse_tickers(Path(path).read_text())
+    except FileNotFoundError:
+        return []
+
+
+class Popularity:
+    """Zählt Aufrufe je Ticker; halbiert die Zähler regelmäßig, damit alte Favoriten auslaufen."""
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def note(self, ticker):
+        with self._lock:
+            self._counts[ticker] += 1
+
+    def top(self, n):
+        with self._lock:
+            return [t for t, _ in self._counts.most_common(n)]
+
+    def decay(self):
+        with self._lock:
+            self._counts = Counter({t: c // 2 for t, c in self._counts.items() if c > 1})
+
+
+class Warmer:
+    """Hintergrund-Thread, der Watchlist und beliebte Ticker warm hält.
+
+    `warm_ticker(ticker)` lädt bzw. erneuert einen Ticker und gibt dessen Währung zurück,
+    `warm_currency(currency)` erneuert den Wechselkurs. Beide schreiben in die Caches der App.
+    `refresh_earnings(tickers)` (optional) läuft vor jedem Durchlauf und frischt den Earnings-Index
+    auf – gebündelt höchstens einmal am Tag, einzeln nur für neu hinzugekommene Ticker.
+    `refresh_symbols()` (optional) baut das Symbolverzeichnis neu, sobald es veraltet ist.
+    """
+
+    def __init__(self, warm_ticker, warm_currency, watchlist=WATCHLIST, interval=WARM_INTERVAL,
+                 workers=WARM_WORKERS, top=WARM_TOP, refresh_earnings=None, refresh_symbols=None):
+        self.warm_ticker = warm_ticker
+        self.warm_currency = warm_currency
+        self.refresh_earnings = refresh_earnings
+        self.refresh_symbols = refresh_symbols
+        self.watchlist = watchlist
+        self.interval = interval
+        self.workers = workers
+        self.top = top
+        self.popularity = Popularity()
+        self.last_run = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def tickers(self):
+        out = read_watchlist(self.watchlist)
+        return out + [t for t in self.popularity.top(self.top) if t not in out]
+
+    def run_once(self):
+        """Ein Durchlauf; Rückgabe: {"tickers", "currencies", "errors", "seconds"}."""
+        t0 = time.perf_counter()
+        tickers = self.tickers()
+        errors = {}
+        currencies = set()
+        if self.refresh_earnings is not None:
+            try:
+                self.refresh_earnings(tickers)  # protokolliert fehlende Termine selbst
+            except Exception as e:
+                errors["Earnings"] = f"{type(e).__name__}: {e}"
+        if self.refresh_symbols is not None:
+            try:
+                self.refresh_symbols()
+            except Exception as e:
+                errors["Symbole"] = f"{type(e).__name__}: {e}"
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ares-warm",
+                                initializer=mark_background) as pool:
+            futures = {t: pool.submit(self.warm_ticker, t) for t in tickers}
+            for ticker, fut in futures.items():
+                try:
+                    currencies.add(fut.result())
+                except Exception as e:
+                    errors[ticker] = f"{type(e).__name__}: {e}"
+        for currency in sorted(c for c in currencies if c and c != "EUR"):
+            try:
+                self.warm_currency(currency)
+            except Exception as e:
+                errors[currency] = f"{type(e).__name__}: {e}"
+        seconds = time.perf_counter() - t0
+        METRICS.observe("warm.cycle", seconds)
+        for ticker, error in errors.items():
+            METRICS.event("warm", "error")
+            log.warning("Vorwärmen von %s fehlgeschlagen: %s", ticker, error)
+        self.last_run = {"tickers": len(tickers), "currencies": len(currencies - {None, "EUR"}),
+                         "errors": errors, "seconds": seconds, "at": time.time()}
+        return self.last_run
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="ares-warmer", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        # Eigener Pool und nachrangiger Anteil am Ratenlimit für alles, was dieser Thread anstößt
+        mark_background()
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                log.exception("Vorwärm-Durchlauf fehlgeschlagen")
+            self.popularity.decay()
+            self._stop.wait(self.interval)
@@ -0,0 +1,163 @@
+"""Indikator-Engine gegen die bisherige pandas-Rechnung: Gleichheit prüfen und Laufzeiten messen.
+
+Aufruf aus dem Repo-Wurzelverzeichnis:  python -m benchmarks.bench_indicators
+"""
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from ares.backtest import simulate
+from ares.core import STOP_ATR_MULT, VOL_MIN
+from ares.indicators import ATRState, RollingMean, VolatilityState, atr, atr_last, rolling_mean, volatility
+
+RTOL = 1e-9
+
+
+def synthetic_ohlc(n, width=None, seed=0):
+    rng = np.random.default_rng(seed)
+    shape = (n,) if width is None else (n, width)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, shape), axis=0))
+    high = close * (1 + np.abs(rng.normal(0, 0.005, shape)))
+    low = close * (1 - np.abs(rng.normal(0, 0.005, shape)))
+    volume = rng.integers(10_000, 5_000_000, shape).astype(float)
+    return high, low, close, volume
+
+
+def legacy_position(hist_full):
+    """Bisherige Rechnung aus app.py (pandas concat + rolling)."""
+    curr_p = hist_full["Close"].iloc[-1]
+    h, l, c = hist_full["High"].tail(100), hist_full["Low"].tail(100), hist_full["Close"].tail(100)
+    tr = pd.concat([(h-l).abs(), (h-c.shift(1)).abs(), (l-c.shift(1)).abs()], axis=1).max(axis=1)
+    atr_val = tr.rolling(14).mean().iloc[-1]
+    return atr_val, (atr_val / curr_p) * 1.5 * 100
+
+
+def numpy_position(hist_full):
+    curr_p = hist_full["Close"].iloc[-1]
+    atr_val = atr_last(hist_full["High"].to_numpy(), hist_full["Low"].to_numpy(), hist_full["Close"].to_numpy())
+    return atr_val, (atr_val / curr_p) * 1.5 * 100
+
+
+def legacy_backtest(open_, high, low, close, volume, horizon, blocked, risk_eur, ex_rate):
+    """Referenz für `simulate`: jeder Bar einzeln in Python, ATR und Volumen wie in der App über pandas."""
+    h, l, c = pd.Series(high), pd.Series(low), pd.Series(close)
+    tr = pd.concat([(h-l).abs(), (h-c.shift(1)).abs(), (l-c.shift(1)).abs()], axis=1).max(axis=1)
+    vol = pd.Series(volume)
+    atr_s = tr.rolling(14).mean().to_numpy()
+    # Feiertage (NaN) zählen nicht mit; bewertbar erst ab 20 eigenen Handelstagen
+    vol20 = vol.rolling(20, min_periods=1).mean().where(vol.notna().cumsum() >= 20).to_numpy()
+    n = len(close)
+    out = {k: np.full(n, np.nan) for k in ("exit", "r", "pnl_eur")}
+    out.update({k: np.zeros(n, dtype=bool) for k in ("trade", "green", "hit", "gap")})
+    for i in range(n - horizon):
+        dist = STOP_ATR_MULT * atr_s[i]
+        if not (np.isfinite(dist) and dist > 0 and np.isfinite(vol20[i])):
+            continue
+        stop = close[i] - dist
+        exit_ = close[i + horizon]
+        for k in range(1, horizon + 1):
+            if low[i + k] <= stop:
+                out["hit"][i] = True
+                out["gap"][i] = open_[i + k] <= stop
+                exit_ = open_[i + k] if out["gap"][i] else stop
+                break
+        shares = np.floor((risk_eur / ex_rate) / dist)
+        out["trade"][i] = True
+        out["green"][i] = vol20[i] >= VOL_MIN and not blocked[i]
+        out["exit"][i], out["r"][i] = exit_, (exit_ - close[i]) / dist
+        out["pnl_eur"][i] = shares * (exit_ - close[i]) * ex_rate
+    return out
+
+
+def check_backtest_equivalence():
+    """Vektorisierter Backtest == Schleife über jeden Bar (inkl. Gaps, Sperrfristen und Anlaufphase)."""
+    for n, horizon in ((15, 10), (40, 5), (600, 10)):
+        high, low, close, volume = synthetic_ohlc(n, seed=n)
+        rng = np.random.default_rng(n)
+        # Eröffnung teils unter dem Vortagestief -> Gaps durch den Stop
+        open_ = close * (1 + rng.normal(0, 0.02, n))
+        volume[rng.random(n) < 0.3] = 100_000  # Ampel wechselt zwischen GRÜN und ROT
+        volume[rng.random(n) < 0.05] = np.nan  # Feiertage aus `align`
+        blocked = rng.random(n) < 0.1
+        got = simulate(open_, high, low, close, volume, horizon, blocked, risk_eur=100.0, ex_rate=0.9)
+        want = legacy_backtest(open_, high, low, close, volume, horizon, blocked, 100.0, 0.9)
+        for key in ("trade", "green", "hit", "gap"):
+            m = want["trade"] if key != "trade" else slice(None)
+            np.testing.assert_array_equal(got[key][:, 0][m], want[key][m], err_msg=key)
+        for key in ("exit", "r", "pnl_eur"):
+            np.testing.assert_allclose(np.where(got["trade"][:, 0], got[key][:, 0], np.nan), want[key],
+                                       rtol=RTOL, equal_nan=True, err_msg=key)
+
+
+def check_equivalence():
+    for n in (10, 14, 15, 100, 10_000):
+        high, low, close, volume = synthetic_ohlc(n, seed=n)
+        hist = pd.DataFrame({"High": high, "Low": low, "Close": close, "Volume": volume})
+        np.testing.assert_allclose(numpy_position(hist), legacy_position(hist), rtol=RTOL, equal_nan=True)
+
+    high, low, close, volume = synthetic_ohlc(2_000, seed=1)
+    h, l, c = pd.Series(high), pd.Series(low), pd.Series(close)
+    tr = pd.concat([(h-l).abs(), (h-c.shift(1)).abs(), (l-c.shift(1)).abs()], axis=1).max(axis=1)
+    np.testing.assert_allclose(atr(high, low, close), tr.rolling(14).mean(), rtol=RTOL, equal_nan=True)
+    np.testing.assert_allclose(rolling_mean(volume, 20), pd.Series(volume).rolling(20).mean(), rtol=RTOL, equal_nan=True)
+    gappy = np.where(np.random.default_rng(2).random(len(volume)) < 0.1, np.nan, volume)
+    np.testing.assert_allclose(rolling_mean(gappy, 20, min_periods=15), pd.Series(gappy).rolling(20, min_periods=15).mean(),
+                               rtol=RTOL, equal_nan=True)
+    log_r = np.log(c / c.shift(1))
+    np.testing.assert_allclose(volatility(close), log_r.rolling(20).std() * np.sqrt(252), rtol=RTOL, equal_nan=True)
+
+    # Inkrementelle Zustände müssen der vollen Neuberechnung folgen (1-D und 2-D)
+    for width in (None, 50):
+        high, low, close, volume = synthetic_ohlc(300, width, seed=2)
+        state = ATRState.from_history(high[:200], low[:200], close[:200])
+        vol_state = RollingMean.from_history(volume[:200], 20)
+        sigma_state = VolatilityState.from_history(close[:200])
+        for i in range(200, 300):
+            state.update(high[i], low[i], close[i])
+            vol_state.update(volume[i])
+            sigma_state.update(close[i])
+        np.testing.assert_allclose(state.value, atr(high, low, close)[-1], rtol=1e-7)
+        np.testing.assert_allclose(vol_state.value, rolling_mean(volume, 20)[-1], rtol=1e-7)
+        np.testing.assert_allclose(sigma_state.value, volatility(close)[-1], rtol=1e-6)
+
+    # 2-D Panel == Spalte für Spalte
+    high, low, close, _ = synthetic_ohlc(500, 200, seed=3)
+    panel = atr(high, low, close)
+    for j in (0, 77, 199):
+        np.testing.assert_allclose(panel[:, j], atr(high[:, j], low[:, j], close[:, j]), rtol=RTOL, equal_nan=True)
+    check_backtest_equivalence()
+    print("Gleichheit: OK (atr_val, stop_pct, ATR-/Volumen-/Volatilitätsreihen, inkrementell, 2-D, Backtest)")
+
+
+def bench(label, fn, number):
+    best = min(timeit.repeat(fn, number=number, repeat=5)) / number
+    print(f"{label:<48} {best * 1e6:>10.1f} µs")
+    return best
+
+
+def run():
+    check_equivalence()
+    high, low, close, volume = synthetic_ohlc(10_000)
+    hist = pd.DataFrame({"High": high, "Low": low, "Close": close, "Volume": volume})
+    t_old = bench("pandas: atr_val/stop_pct (bisher)", lambda: legacy_position(hist), 200)
+    t_new = bench("numpy:  atr_val/stop_pct", lambda: numpy_position(hist), 2000)
+    print(f"{'':<48} Faktor {t_old / t_new:.1f}x")
+
+    state = ATRState.from_history(high, low, close)
+    bench("numpy:  ATRState.update (1 Bar)", lambda: state.update(high[-1], low[-1], close[-1]), 20000)
+
+    ph, pl, pc, _ = synthetic_ohlc(250, 500, seed=4)
+    frames = {k: pd.DataFrame(v) for k, v in (("h", ph), ("l", pl), ("c", pc))}
+
+    def pandas_panel():
+        return [legacy_position(pd.DataFrame({"High": frames["h"][j], "Low": frames["l"][j], "Close": frames["c"][j]}))
+                for j in range(pc.shape[1])]
+
+    t_old = bench("pandas: ATR für 500 Ticker (Schleife)", pandas_panel, 2)
+    t_new = bench("numpy:  ATR für 500 Ticker (2-D)", lambda: atr_last(ph, pl, pc), 200)
+    print(f"{'':<48} Faktor {t_old / t_new:.1f}x")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,104 @@
+"""Lastspitze gegen einen lokalen Yahoo-Stub: naive Einzel-Sessions vs. geteilte Session mit
+Single-Flight, Token-Bucket und Retry.
+
+Der Stub drosselt wie Yahoo: mehr als `--limit` Anfragen pro Sekunde werden mit 429 beantwortet.
+
+    python -m benchmarks.burst --clients 20 --tickers 5 --limit 10
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ares.cache import SingleFlight
+from ares.net import RateLimitedSession, TokenBucket, _BaseSession, _SESSION_KWARGS
+
+
+class Stub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, limit, latency):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.limit = limit
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.window = (0, 0)  # (Sekunde, Anfragen in dieser Sekunde)
+        self.requests = 0
+        self.throttled = 0
+
+    def admit(self):
+        with self.lock:
+            self.requests += 1
+            second = int(time.monotonic())
+            start, count = self.window
+            count = count + 1 if start == second else 1
+            self.window = (second, count)
+            if count > self.limit:
+                self.throttled += 1
+                return False
+            return True
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if not self.server.admit():
+            self.send_response(429)
+            self.send_header("Retry-After", "1")
+            self.end_headers()
+            return
+        time.sleep(self.server.latency)
+        body = json.dumps({"symbol": self.path.rsplit("/", 1)[-1], "price": 100.0}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def run(mode, clients, tickers, limit, latency):
+    server = Stub(limit, latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}/quote"
+    if mode == "naive":
+        def fetch(url):
+            return _BaseSession(**_SESSION_KWARGS).get(url).status_code
+    else:
+        session = RateLimitedSession(bucket=TokenBucket(rate=limit * 0.8, burst=limit), backoff=0.2)
+        flight = SingleFlight()
+
+        def fetch(url):
+            return flight.do(url, lambda: session.get(url).status_code)
+
+    urls = [f"{base}/T{i}" for _ in range(clients) for i in range(tickers)]
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        statuses = list(pool.map(fetch, urls))
+    elapsed = time.perf_counter() - t0
+    server.shutdown()
+    server.server_close()
+    return {"upstream": server.requests, "429": server.throttled,
+            "failed": sum(s != 200 for s in statuses), "seconds": elapsed}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.burst")
+    parser.add_argument("--clients", type=int, default=20, help="Gleichzeitige Sessions")
+    parser.add_argument("--tickers", type=int, default=5, help="Ticker je Session (bei allen identisch)")
+    parser.add_argument("--limit", type=int, default=10, help="Anfragen/s, ab denen der Stub 429 liefert")
+    parser.add_argument("--latency", type=float, default=0.2, help="Antwortzeit des Stubs in s")
+    args = parser.parse_args(argv)
+
+    print(f"{args.clients} Sessions × {args.tickers} Ticker, Stub-Limit {args.limit}/s")
+    print(f"{'Modus':<8} {'Upstream':>9} {'429':>6} {'Fehlgeschl.':>12} {'Dauer':>8}")
+    for mode in ("naive", "ares"):
+        r = run(mode, args.clients, args.tickers, args.limit, args.latency)
+        print(f"{mode:<8} {r['upstream']:>9} {r['429']:>6} {r['failed']:>12} {r['seconds']:>7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Synthetische Fixtures im Layout von `ares.providers.FixtureProvider` (realistische Größen, kein Netzwerk)."""
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+FX_PAIRS = ["USDEUR=X", "GBPEUR=X", "GBPUSD=X", "CHFEUR=X", "CHFUSD=X"]
+
+
+def synthetic_history(n, seed=0, freq="B", end=None, tz="America/New_York"):
+    rng = np.random.default_rng(seed)
+    end = end or pd.Timestamp.now(tz=tz).normalize()
+    idx = pd.date_range(end=end, periods=n, freq=freq, tz=tz)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    open_ = close * (1 + rng.normal(0, 0.003, n))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.005, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.005, n)))
+    return pd.DataFrame({
+        "Open": open_, "High": high, "Low": low, "Close": close,
+        "Volume": rng.integers(100_000, 5_000_000, n), "Dividends": 0.0, "Stock Splits": 0.0,
+    }, index=idx)
+
+
+def synthetic_statements(seed=0, periods=4):
+    rng = np.random.default_rng(seed)
+    cols = pd.date_range(end="2025-12-31", periods=periods, freq="YE")[::-1]
+    def rows(names, scale):
+        return pd.DataFrame(rng.uniform(0.5, 1.5, (len(names), periods)) * scale, index=names, columns=cols)
+    inc = rows(["Total Revenue", "Net Income", "EBITDA", "Operating Income", "Gross Profit"], 1e10)
+    inc.loc["Diluted EPS"] = rng.uniform(1, 10, periods)
+    bal = rows(["Stockholders Equity", "Current Assets", "Current Liabilities", "Total Debt", "Total Assets"], 5e10)
+    bal.loc["Ordinary Shares Number"] = rng.uniform(1e9, 2e9, periods)
+    cf = rows(["Operating Cash Flow", "Free Cash Flow", "Capital Expenditure"], 1e10)
+    return inc, bal, cf
+
+
+def write_ticker(root, ticker, seed=0, years=40):
+    d = Path(root) / ticker
+    d.mkdir(parents=True, exist_ok=True)
+    synthetic_history(252 * years, seed).to_parquet(d / "history.parquet")
+    synthetic_history(78, seed + 1, freq="5min").to_parquet(d / "history_5m.parquet")
+    synthetic_history(130, seed + 2, freq="15min").to_parquet(d / "history_15m.parquet")
+    info = {"currency": "USD", "shortName": f"{ticker} Corp", "trailingPE": 25.0, "priceToBook": 8.0}
+    (d / "info.json").write_text(json.dumps(info))
+    for name, frame in zip(("financials", "balance_sheet", "cashflow"), synthetic_statements(seed)):
+        frame.T.set_axis(frame.index.astype(str), axis=1).to_parquet(d / f"{name}.parquet")
+    earn = (pd.Timestamp.now() + pd.Timedelta(days=10 + seed % 60)).date()
+    (d / "calendar.json").write_text(json.dumps({"earnings_date": str(earn)}))
+
+
+def make_fixtures(root, tickers, years=40):
+    for i, t in enumerate(tickers):
+        write_ticker(root, t, seed=i, years=years)
+    for i, pair in enumerate(FX_PAIRS):
+        d = Path(root) / pair
+        d.mkdir(parents=True, exist_ok=True)
+        h = synthetic_history(300, 1000 + i)
+        h[["Open", "High", "Low", "Close"]] /= h["Close"].iloc[-1]
+        h.to_parquet(d / "history.parquet")
+    return Path(root)
+
+
+def synthetic_listings(n, seed=0):
+    """`n` erfundene Börseneinträge (symbol, name, exchange) im Yahoo-Format, z.T. mit Börsenkürzel."""
+    rng = np.random.default_rng(seed)
+    letters = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"))
+    words = ["Global", "Energy", "Bank", "Motor", "Pharma", "Tech", "Holding", "Systems", "Capital", "Foods",
+             "Mining", "Telecom", "Retail", "Bio", "Solar", "Airlines", "Chemie", "Versicherung", "Bau", "Logistik"]
+    suffixes = np.array(["", "", "", ".DE", ".L", ".PA", ".VI", ".TO", ".HK", ".T"])
+    stems = pd.Series(rng.choice(letters, (n, 5)).view("U5").ravel())
+    symbols = pd.Series([s[:k] for s, k in zip(stems, rng.integers(2, 6, n))]) + rng.choice(suffixes, n)
+    names = stems.str.title() + " " + rng.choice(words, n) + " " + rng.choice(words, n)
+    return pd.DataFrame({"symbol": symbols, "name": names, "exchange": "X"})
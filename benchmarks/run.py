@@ -0,0 +1,153 @@
+"""Offline-Benchmark-Suite: Laden (kalt/warm), ATR, KPIs, Chart-Aufbau, Screener, Backtest, ZIP-Export
+und Symbolsuche.
+
+Alle Daten kommen aus synthetischen Fixtures über den FixtureProvider (kein Netzwerk nötig);
+die simulierte Latenz je Yahoo-Aufruf ist einstellbar.
+
+    python -m benchmarks.run                               # Tabelle ausgeben
+    python -m benchmarks.run --save benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json --tolerance 1.3   # Exit 1 bei Regression
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from ares.backtest import backtest
+from ares.charts import chart_history, price_figure
+from ares.core import analyze, load_ticker_data
+from ares.export import export_zip
+from ares.fx import fx_history, latest_rates
+from ares.indicators import atr_last
+from ares.kpis import kpi_matrix
+from ares.providers import FixtureProvider, set_provider
+from ares.screener import screen_panel
+from ares.store import PriceStore
+from ares.symbols import SymbolIndex, build as build_symbols
+from benchmarks.bench_indicators import check_equivalence, legacy_position
+from benchmarks.fixtures import make_fixtures, synthetic_history, synthetic_listings
+
+TICKERS = ["AAA", "BBB", "CCC"]
+
+
+def measure(fn, rounds, setup=None):
+    """Wie pytest-benchmark: `setup` läuft vor jeder Runde und wird nicht mitgemessen."""
+    samples = []
+    for _ in range(rounds):
+        arg = setup() if setup else None
+        t0 = time.perf_counter()
+        fn(arg) if setup else fn()
+        samples.append(time.perf_counter() - t0)
+    samples.sort()
+    return {
+        "min": samples[0],
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "p95": samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))],
+        "rounds": rounds,
+    }
+
+
+def build_chart(hist):
+    """Figur aufbauen und serialisieren (entspricht der Nutzlast an den Browser)."""
+    return price_figure(hist).to_json()
+
+
+def suite(root, latency, rounds):
+    provider = FixtureProvider(root, latency=latency)
+    set_provider(provider)
+    store_root = Path(root) / "_store"
+    warm_store = PriceStore(store_root / "warm")
+    load_ticker_data("AAA", warm_store)
+    data = load_ticker_data("AAA", warm_store)
+    hist = data.hist
+    high, low, close = (hist[c].to_numpy() for c in ("High", "Low", "Close"))
+
+    panel_hist = {f"T{i}": synthetic_history(130, i) for i in range(300)}
+    panel = pd.concat(panel_hist, axis=1).swaplevel(0, 1, axis=1).sort_index(axis=1)
+    study = {f"T{i}": synthetic_history(2520, i) for i in range(300)}  # 300 Ticker × 10 Jahre
+    cold_counter = iter(range(10**6))
+    build_symbols(synthetic_listings(150_000), Path(root) / "_symbols")
+    symbols = SymbolIndex(Path(root) / "_symbols")  # ~110k eindeutige Einträge
+
+    cases = {
+        "load_cold": (lambda store: load_ticker_data("AAA", store),
+                      lambda: PriceStore(store_root / f"cold{next(cold_counter)}")),
+        "load_warm": (lambda: load_ticker_data("AAA", warm_store), None),
+        "fx_rates": (lambda: latest_rates(fx_history(["USD", "GBp", "CHF"])), None),
+        "atr_numpy": (lambda: atr_last(high, low, close), None),
+        "atr_pandas_legacy": (lambda: legacy_position(hist), None),
+        "kpi_matrix": (lambda: kpi_matrix(data.inc, data.bal, hist), None),
+        "analyze": (lambda: analyze("AAA", data, 10000, 1.0, True, 0.9), None),
+        "chart_1J": (lambda: build_chart(chart_history(hist, "1J")), None),
+        "chart_Max": (lambda: build_chart(chart_history(hist, "Max")), None),
+        "screener_300": (lambda: screen_panel(panel, 10000, 1.0, {"USD": 0.9}), None),
+        "backtest_300x10y": (lambda: backtest(study), None),
+        "zip_export": (lambda: export_zip(data), None),
+        "zip_export_parquet": (lambda: export_zip(data, "parquet"), None),
+        "symbols_open": (lambda: SymbolIndex(Path(root) / "_symbols"), None),
+        "symbols_prefix": (lambda: symbols.search("AB"), None),
+        "symbols_name": (lambda: symbols.search("bank"), None),
+        "symbols_typo": (lambda: symbols.search("QXMP.PA"), None),
+    }
+    results = {}
+    for name, (fn, setup) in cases.items():
+        results[name] = measure(fn, rounds, setup)
+    results["_meta"] = {"latency": latency, "rounds": rounds, "provider_calls": provider.calls}
+    return results
+
+
+def print_table(results, baseline=None):
+    print(f"{'Benchmark':<20} {'min':>10} {'median':>10} {'p95':>10}" + ("   vs. Baseline" if baseline else ""))
+    for name, r in results.items():
+        if name.startswith("_"):
+            continue
+        line = f"{name:<20} {r['min']*1e3:>8.2f}ms {r['median']*1e3:>8.2f}ms {r['p95']*1e3:>8.2f}ms"
+        if baseline and name in baseline:
+            line += f"   {r['median'] / baseline[name]['median']:.2f}x"
+        print(line)
+
+
+def regressions(results, baseline, tolerance, min_delta):
+    """Langsamer als Baseline × tolerance UND absolut mehr als `min_delta` Sekunden (Rauschen im µs-Bereich)."""
+    return [name for name, r in results.items()
+            if not name.startswith("_") and name in baseline
+            and r["median"] > baseline[name]["median"] * tolerance
+            and r["median"] - baseline[name]["median"] > min_delta]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulierte Latenz je Aufruf in s (Standard 0.05)")
+    parser.add_argument("--rounds", type=int, default=15)
+    parser.add_argument("--years", type=int, default=40, help="Länge der synthetischen Historie")
+    parser.add_argument("--save", help="Ergebnisse als JSON speichern (Baseline)")
+    parser.add_argument("--compare", help="Baseline-JSON zum Vergleich")
+    parser.add_argument("--tolerance", type=float, default=1.3, help="Erlaubter Faktor auf den Median")
+    parser.add_argument("--min-delta", type=float, default=0.0005, help="Mindestabweichung in s (Standard 0.5 ms)")
+    args = parser.parse_args(argv)
+
+    check_equivalence()
+    with tempfile.TemporaryDirectory(prefix="ares-fixtures-") as root:
+        make_fixtures(root, TICKERS, years=args.years)
+        results = suite(root, args.latency, args.rounds)
+
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print_table(results, baseline)
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, indent=2))
+    if baseline:
+        slow = regressions(results, baseline, args.tolerance, args.min_delta)
+        if slow:
+            print(f"Regression (> {args.tolerance}x Median): {', '.join(slow)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())